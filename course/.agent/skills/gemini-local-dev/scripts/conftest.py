@@ -0,0 +1,25 @@
+"""
+测试公共夹具
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_api_analyzer import ModelConfig  # noqa: E402
+
+
+@pytest.fixture
+def model_config():
+    """ModelConfig 工厂: 只需给出与测试相关的字段，其余使用空值"""
+    def make(model: str = 'gemini-3-flash-preview', category: str = 'text_generation', **overrides) -> ModelConfig:
+        fields = dict(
+            name=model, description='', api_version='v1beta', endpoint='generateContent',
+            request_template={}, response_example={}, extract_path='', use_cases=[], keywords=[],
+        )
+        fields.update(overrides)
+        return ModelConfig(model=model, category=category, **fields)
+    return make
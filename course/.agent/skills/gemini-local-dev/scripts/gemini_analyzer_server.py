@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Gemini API 分析器 - 常驻服务模式 (JSON-RPC over stdio)
+
+供编辑器 / Agent 集成使用：进程启动时加载一次配置，之后通过 stdin/stdout
+按行收发 JSON-RPC 2.0 消息，避免每次请求都重新启动解释器、加载配置和扫描磁盘。
+
+协议: 每行一条 JSON-RPC 2.0 请求，响应同样每行一条（可能乱序，按 id 对应）。
+分析器自身的日志输出全部重定向到 stderr，stdout 只承载协议消息。
+
+方法:
+    analyzeBuffer {path, content}  分析未保存的缓冲区，不访问磁盘
+    analyzeFile   {path}           读取磁盘文件后分析
+    scan          {}               全量扫描项目并重建符号索引（同步执行，后续请求使用新索引）
+    stats         {}               缓存命中率等统计
+    shutdown      {}               退出服务
+
+使用方式:
+    python gemini_analyzer_server.py [--project DIR] [--cache-size 512] [--workers 4]
+
+    → {"jsonrpc": "2.0", "id": 1, "method": "analyzeBuffer",
+       "params": {"path": "src/api.ts", "content": "..."}}
+    ← {"jsonrpc": "2.0", "id": 1, "result": {"calls": [...], "degraded": [], "cached": false, "elapsed_ms": 1.8}}
+
+通知（不带 id 的请求）照常执行，但不返回任何响应，包括错误。
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+from gemini_api_analyzer import GeminiAnalyzer
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    """携带 JSON-RPC 错误码的异常"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class ResultCache:
+    """线程安全的 LRU 缓存，键为 (相对路径, 内容哈希)，值为 {"calls", "degraded"}"""
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, str], value: Dict[str, Any]):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AnalyzerServer:
+    """共享单个 GeminiAnalyzer 实例的 JSON-RPC 服务"""
+
+    def __init__(self, analyzer: GeminiAnalyzer, cache_size: int = 512, workers: int = 4):
+        self.analyzer = analyzer
+        self.cache = ResultCache(cache_size)
+        self.workers = workers
+        self.running = True
+        # 每次 scan 后递增，作为缓存键的一部分，避免并发中写入过期结果
+        self._generation = 0
+        self._scan_lock = threading.Lock()
+        self._methods = {
+            'analyzeBuffer': self.analyze_buffer,
+            'analyzeFile': self.analyze_file,
+            'scan': self.scan,
+            'stats': self.stats,
+            'shutdown': self.shutdown,
+        }
+
+    # ---------- 方法 ----------
+
+    def analyze_buffer(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        path = params.get('path')
+        content = params.get('content')
+        if not isinstance(path, str) or not isinstance(content, str):
+            raise RPCError(INVALID_PARAMS, "analyzeBuffer 需要字符串参数 path 和 content")
+
+        start = time.perf_counter()
+        rel_path = self._relative_path(path)
+        key = (rel_path, f"{self._generation}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}")
+
+        entry = self.cache.get(key)
+        cached = entry is not None
+        if not cached:
+            # analyze_source 不修改分析器状态，可并发执行
+            calls, degraded = self.analyzer.analyze_source(rel_path, content)
+            entry = {"calls": [self._call_result(call) for call in calls], "degraded": degraded}
+            self.cache.put(key, entry)
+
+        return {
+            "calls": entry["calls"],
+            "degraded": entry["degraded"],
+            "cached": cached,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def analyze_file(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        path = params.get('path')
+        if not isinstance(path, str):
+            raise RPCError(INVALID_PARAMS, "analyzeFile 需要字符串参数 path")
+        file_path = Path(path) if Path(path).is_absolute() else self.analyzer.root / path
+        try:
+            content = file_path.read_text(encoding='utf-8')
+        except OSError as e:
+            raise RPCError(INVALID_PARAMS, f"无法读取文件: {e}")
+        return self.analyze_buffer({"path": path, "content": content})
+
+    def scan(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self._scan_lock:
+            self.analyzer.scan()
+            # 符号索引已变化，缓存的结果可能过期
+            self._generation += 1
+            self.cache.clear()
+            calls = [self._call_result(call) for call in self.analyzer.api_calls]
+        return {
+            "calls": calls,
+            "degraded_files": self.analyzer.degraded_files,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def stats(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "indexed_files": len(self.analyzer.symbol_index.files),
+            "models_loaded": len(self.analyzer.model_configs)
+        }
+
+    def shutdown(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.running = False
+        return {}
+
+    def _call_result(self, call) -> Dict[str, Any]:
+        result = self.analyzer.call_to_dict(call)
+        if call.matched_config:
+            result["rest_path"] = self.analyzer.get_rest_path(call)
+            result["request_body"] = self.analyzer.get_request_body(call)
+            result["rest_example"] = self.analyzer.get_rest_example(call)
+        return result
+
+    def _relative_path(self, path: str) -> str:
+        """将客户端路径转换为相对项目根目录的路径；项目外的文件只保留文件名"""
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            return str(candidate)
+        try:
+            return str(candidate.resolve().relative_to(self.analyzer.root.resolve()))
+        except ValueError:
+            return candidate.name
+
+    # ---------- 协议 ----------
+
+    def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        """处理单条 JSON-RPC 消息，通知（无 id）无论成功与否都返回 None"""
+        if not isinstance(message, dict) or message.get('jsonrpc') != '2.0' or not isinstance(message.get('method'), str):
+            return self._error(message.get('id') if isinstance(message, dict) else None, INVALID_REQUEST, "Invalid Request")
+
+        is_notification = 'id' not in message
+        request_id = message.get('id')
+        method = self._methods.get(message['method'])
+        try:
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+            params = message.get('params') or {}
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params 必须是对象")
+            result = method(params)
+        except RPCError as e:
+            return None if is_notification else self._error(request_id, e.code, str(e))
+        except Exception as e:
+            return None if is_notification else self._error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def serve(self, stdin: TextIO, stdout: TextIO):
+        """逐行读取请求，在线程池中并发处理，响应写回 stdout"""
+        write_lock = threading.Lock()
+
+        def respond(response: Optional[Dict[str, Any]]):
+            if response is None:
+                return
+            line = json.dumps(response, ensure_ascii=False)
+            with write_lock:
+                stdout.write(line + '\n')
+                stdout.flush()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for line in stdin:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    respond(self._error(None, PARSE_ERROR, f"Parse error: {e}"))
+                    continue
+
+                method = message.get('method') if isinstance(message, dict) else None
+                # shutdown 等待之前的请求全部完成后再响应
+                if method == 'shutdown':
+                    executor.shutdown(wait=True)
+                    respond(self.handle(message))
+                    break
+                # scan 在读取线程中同步执行，之后的请求都基于新的符号索引
+                if method == 'scan':
+                    respond(self.handle(message))
+                    continue
+                executor.submit(lambda m=message: respond(self.handle(m)))
+        finally:
+            executor.shutdown(wait=True)
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Gemini API 分析器常驻服务 (JSON-RPC over stdio)")
+    parser.add_argument('--project', help="项目根目录（默认与 gemini_api_analyzer 相同）")
+    parser.add_argument('--config', help="模型配置文件路径")
+    parser.add_argument('--cache-size', type=int, default=512, help="LRU 缓存的文件结果数")
+    parser.add_argument('--workers', type=int, default=4, help="并发处理请求的线程数")
+    parser.add_argument('--scan', action='store_true', help="启动时先全量扫描一次以建立符号索引")
+    args = parser.parse_args()
+
+    # stdout 只用于协议消息，分析器的打印输出改到 stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    project_root = Path(args.project) if args.project else Path(__file__).parents[4]
+    analyzer = GeminiAnalyzer(project_root, Path(args.config) if args.config else None)
+    if args.scan:
+        analyzer.scan()
+
+    server = AnalyzerServer(analyzer, cache_size=args.cache_size, workers=args.workers)
+    print(f"🚀 分析器服务已就绪 (项目: {project_root})", file=sys.stderr)
+    server.serve(sys.stdin, protocol_out)
+
+
+if __name__ == "__main__":
+    main()
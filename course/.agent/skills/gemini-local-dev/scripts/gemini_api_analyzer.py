@@ -10,19 +10,124 @@ Gemini API 分析器 - Vibe Agent 风格
 
 使用方式:
     python gemini_api_analyzer.py
+    python gemini_api_analyzer.py --input-image-edge 4096 --inline-threshold-mb 8
     或
     from gemini_api_analyzer import analyze
     analyzer = analyze()
     analyzer.print_report()
 """
 
+import argparse
+import os
 import re
 import json
+import time
+import threading
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, FrozenSet, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 
 
+# ============================================
+# 单文件扫描预算
+# ============================================
+# 超过 MAX_FILE_BYTES 的文件直接跳过；
+# 存在超长行（压缩包/minified bundle）或解析超时的文件降级为安全解析器
+MAX_FILE_BYTES = 2 * 1024 * 1024
+MAX_LINE_LENGTH = 20000
+FILE_TIME_BUDGET = 2.0  # 秒
+
+# ============================================
+# 请求体积估算
+# ============================================
+# 单次请求体积超过 INLINE_BYTES_THRESHOLD 或输入图片长边超过 IMAGE_EDGE_THRESHOLD 时给出建议
+INLINE_BYTES_THRESHOLD = 4 * 1024 * 1024
+IMAGE_EDGE_THRESHOLD = 2048
+# 输入图片无法从源码得知尺寸: 按 INPUT_IMAGE_EDGE 长边的正方形估算，
+# 数组类型的图片参数（如 referenceImages: string[]）按 ARRAY_IMAGE_COUNT 张估算
+INPUT_IMAGE_EDGE = 1024
+ARRAY_IMAGE_COUNT = 3
+# 音频输入（非 TTS）按一段 INPUT_AUDIO_SECONDS 秒的内联音频估算
+INPUT_AUDIO_SECONDS = 60
+# Gemini inline_data 请求总大小上限，超过必须使用 File API
+INLINE_REQUEST_LIMIT = 20 * 1024 * 1024
+
+# imageSize -> 长边像素
+_IMAGE_SIZE_PIXELS = {'1K': 1024, '2K': 2048, '4K': 4096}
+# 编码后每像素字节数的经验值
+_JPEG_BYTES_PER_PIXEL = 0.25
+_PNG_BYTES_PER_PIXEL = 1.5
+# 图片输入按 768x768 切块计费，每块 258 tokens；两边都不超过 384 时按 1 块计
+_IMAGE_TILE = 768
+_IMAGE_TILE_TOKENS = 258
+_IMAGE_SMALL_EDGE = 384
+# TTS 输出: 24kHz / 16bit / 单声道 PCM，按默认时长估算
+_PCM_BYTES_PER_SECOND = 24000 * 2
+_TTS_SECONDS = 10
+# 音频输入: 16kHz / 16bit / 单声道 WAV，每秒 32 tokens
+_AUDIO_INPUT_BYTES_PER_SECOND = 16000 * 2
+_AUDIO_TOKENS_PER_SECOND = 32
+_IMAGE_PLACEHOLDER = 'BASE64_IMAGE_DATA'
+
+
+# 函数签名/返回类型的最大长度，保证每次匹配尝试的回溯范围有界
+_MAX_SIGNATURE = 2000
+_MAX_RETURN_TYPE = 500
+
+# 所有模式均以单词边界开头，每次匹配尝试向后扫描的长度都有固定上限，
+# 因此总耗时与输入长度成线性关系（由 scripts/test_regex.py 的语料回归保证）
+_FUNCTION_PATTERN = re.compile(
+    r'\b(?:export\s+)?(?:async\s+)?(?:function|const)\s+(\w+)\s*'
+    r'(?:=\s*(?:async\b)?\s*\(([^)]{0,%d})\)|\(([^)]{0,%d})\))' % (_MAX_SIGNATURE, _MAX_SIGNATURE)
+)
+_METHOD_PATTERN = re.compile(
+    r'\b(?:(?:public|private|protected|static)\s+)*(?:async\s+)?(\w+)\s*'
+    r'\(([^)]{0,%d})\)\s*(?::[^{]{1,%d})?\{' % (_MAX_SIGNATURE, _MAX_RETURN_TYPE)
+)
+_IMAGE_PARAM_PATTERN = re.compile(
+    r'\b(\w+)\s*:\s*[^,\n]{0,200}?(?:[Ii]mage|[Rr]eference|Picture|Photo|File|Base64|Data)'
+)
+_PARAM_NAME_PATTERN = re.compile(r'\b(\w+)\s*:')
+_ARRAY_PARAM_PATTERN = re.compile(
+    r'\b(\w+)\??\s*:\s*(?:[\w.]{1,100}\s*\[\]|(?:Array|ReadonlyArray|List|list|Sequence)\s*[<\[])'
+)
+_PY_DEF_PATTERN = re.compile(r'^[ \t]*(?:async\s+)?def\s+(\w+)\s*\(', re.M)
+_FALLBACK_NAME_PATTERN = re.compile(r'\b(?:function|const|let|var)\s+(\w+)')
+_FALLBACK_PY_NAME_PATTERN = re.compile(r'\bdef\s+(\w+)')
+
+# 顶层符号: 常量、枚举、对象字面量成员和导入（同样保证线性复杂度）
+_LITERAL = r'''(?:(['"`])([^'"`\n]{0,200})\2|(-?\d+(?:\.\d+)?)(?![\w.]))'''
+_TS_CONST_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:const|let|var)\s+(\w+)\s*(?::[^=\n;]{1,100})?=\s*' + _LITERAL, re.M
+)
+_TS_ENUM_PATTERN = re.compile(r'\b(?:export\s+)?(?:const\s+)?enum\s+(\w+)\s*\{([^}]{0,5000})\}')
+_TS_OBJECT_PATTERN = re.compile(
+    r'^(?:export\s+)?const\s+(\w+)\s*(?::[^=\n;]{1,100})?=\s*\{([^{}]{0,5000})\}', re.M
+)
+_TS_MEMBER_PATTERN = re.compile(r'''['"]?\b(\w+)['"]?\s*[:=]\s*''' + _LITERAL)
+_TS_IMPORT_PATTERN = re.compile(r'''\bimport\s+([^;'"]{1,2000}?)\s+from\s*['"]([^'"\n]+)['"]''')
+_TS_REEXPORT_PATTERN = re.compile(r'''\bexport\s*(?:\{([^}]{0,2000})\}|\*)\s*from\s*['"]([^'"\n]+)['"]''')
+_PY_CONST_PATTERN = re.compile(r'\b(\w+)\s*(?::[^=\n]{1,100})?=\s*' + _LITERAL + r'\s*(?:#.*)?$')
+_PY_ENUM_PATTERN = re.compile(r'class\s+(\w+)\s*\([^)]{0,200}Enum[^)]{0,200}\)\s*:')
+_PY_IMPORT_PATTERN = re.compile(r'from\s+([\w.]+)\s+import\s+(.+)$')
+
+# 函数体中引用常量的位置: model: MODEL / model = Models.PRO.value / callGemini(MODEL, ...)
+_IDENTIFIER_VALUE = r'''['"]?\s*[:=]\s*([A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*){0,2})(?![\w$.(])'''
+_MODEL_IDENTIFIER_PATTERNS = [
+    re.compile(r'\bmodel' + _IDENTIFIER_VALUE, re.I),
+    re.compile(r'\bcallGemini\(\s*([A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*){0,2})\s*[,)]'),
+]
+
+# 安全解析器用于定位API调用的锚点
+_FALLBACK_ANCHORS = ['generateContent', 'callGeminiApi', 'generativelanguage']
+_FALLBACK_WINDOW = 3000
+
+
+class _BudgetExceeded(Exception):
+    """单文件解析超出时间预算"""
+
+
 @dataclass
 class APICall:
     """API调用信息"""
@@ -39,6 +144,43 @@ class APICall:
     matched_config: Optional[Dict[str, Any]] = None
     extracted_params: Dict[str, Any] = field(default_factory=dict)
     image_params: List[str] = field(default_factory=list)  # 图片参数名称列表
+    image_array_params: List[str] = field(default_factory=list)  # 其中数组类型的参数（每个按多张图片计）
+    payload: Optional['PayloadEstimate'] = None  # 请求/响应体积估算
+    violations: List['Violation'] = field(default_factory=list)  # 请求参数校验问题
+
+
+@dataclass
+class PayloadEstimate:
+    """单次调用的请求体积与 token 估算"""
+    image_count: int = 0  # 输入图片张数
+    image_dimensions: Tuple[int, int] = (0, 0)  # 每张输入图片的宽高
+    output_dimensions: Tuple[int, int] = (0, 0)  # 输出图片的宽高（图片生成模型）
+    audio_seconds: int = 0  # 内联音频输入的估算时长
+    inline_bytes: int = 0  # base64 编码后的内联数据字节数
+    request_bytes: int = 0
+    request_tokens: int = 0
+    response_bytes: int = 0
+    response_tokens: int = 0
+    recommendations: List[str] = field(default_factory=list)
+
+    @property
+    def bytes_per_invocation(self) -> int:
+        return self.request_bytes + self.response_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "image_count": self.image_count,
+            "image_dimensions": list(self.image_dimensions),
+            "output_dimensions": list(self.output_dimensions),
+            "audio_seconds": self.audio_seconds,
+            "inline_bytes": self.inline_bytes,
+            "request_bytes": self.request_bytes,
+            "request_tokens": self.request_tokens,
+            "response_bytes": self.response_bytes,
+            "response_tokens": self.response_tokens,
+            "bytes_per_invocation": self.bytes_per_invocation,
+            "recommendations": self.recommendations
+        }
 
 
 @dataclass
@@ -56,16 +198,465 @@ class ModelConfig:
     use_cases: List[str]
     keywords: List[str]
     default_params: Dict[str, Any] = field(default_factory=dict)
+    aspect_ratios: List[str] = field(default_factory=list)
+    image_sizes: List[str] = field(default_factory=list)
+    request_templates: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # 所有 request_template* 变体
+    thinking_levels: List[str] = field(default_factory=list)
+    voices: List[str] = field(default_factory=list)
+    max_output_tokens: Optional[int] = None  # context_window.output
+
+
+@dataclass
+class FileSymbols:
+    """单个文件的顶层符号表"""
+    module: str  # 模块键: 相对路径去掉扩展名 (posix)，如 src/constants
+    constants: Dict[str, Any] = field(default_factory=dict)  # 名称 -> 字面量，枚举/对象成员为 "Enum.Member"
+    imports: Dict[str, Tuple[str, str]] = field(default_factory=dict)  # 本地名 -> (模块说明符, 导出名)，"*" 表示命名空间导入
+    star_exports: List[str] = field(default_factory=list)  # export * from '...'
+
+
+class SymbolIndex:
+    """项目级符号索引
+
+    每次扫描构建一次，记录所有文件的顶层常量、枚举和导入。
+    标识符解析只做字典查找（跨文件跳转有上限），结果按 (文件, 标识符) 缓存，
+    并记录解析过程中查找过的模块，供叠加视图判断缓存是否受缓冲区影响。
+    """
+
+    _MAX_HOPS = 8
+    _TS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+
+    def __init__(self, files: Optional[Dict[str, FileSymbols]] = None):
+        self.files: Dict[str, FileSymbols] = files or {}  # 相对路径 -> 符号表
+        self._modules: Dict[str, FileSymbols] = {}
+        for symbols in self.files.values():
+            self._modules[symbols.module] = symbols
+            # 目录索引文件: src/config/index -> src/config
+            if symbols.module.endswith('/index'):
+                self._modules.setdefault(symbols.module[:-len('/index')], symbols)
+            elif symbols.module.endswith('/__init__'):
+                self._modules.setdefault(symbols.module[:-len('/__init__')], symbols)
+        # (文件, 标识符) -> (值, 解析时查找过的模块)
+        self._resolved: Dict[Tuple[str, str], Tuple[Any, FrozenSet[str]]] = {}
+
+    def overlay(self, rel_path: str, symbols: FileSymbols) -> 'SymbolIndex':
+        """返回用 symbols 替换 rel_path 后的只读视图，原索引不变，构建开销与项目大小无关"""
+        return _SymbolOverlay(self, rel_path, symbols)
+
+    @staticmethod
+    def module_key(rel_path: str) -> str:
+        path = Path(rel_path)
+        return path.with_suffix('').as_posix()
+
+    @staticmethod
+    def parse(rel_path: str, content: str) -> FileSymbols:
+        """提取文件的顶层常量、枚举和导入"""
+        symbols = FileSymbols(module=SymbolIndex.module_key(rel_path))
+        if rel_path.endswith('.py'):
+            SymbolIndex._parse_python(symbols, content)
+        else:
+            SymbolIndex._parse_ts(symbols, content)
+        return symbols
+
+    @staticmethod
+    def _literal(match: re.Match, str_group: int) -> Any:
+        if match.group(str_group + 1) is not None:
+            return match.group(str_group + 1)
+        number = match.group(str_group + 2)
+        return float(number) if '.' in number else int(number)
+
+    @staticmethod
+    def _parse_ts(symbols: FileSymbols, content: str):
+        for match in _TS_CONST_PATTERN.finditer(content):
+            symbols.constants.setdefault(match.group(1), SymbolIndex._literal(match, 2))
+
+        for match in _TS_ENUM_PATTERN.finditer(content):
+            for member in _TS_MEMBER_PATTERN.finditer(match.group(2)):
+                symbols.constants[f"{match.group(1)}.{member.group(1)}"] = SymbolIndex._literal(member, 2)
+
+        for match in _TS_OBJECT_PATTERN.finditer(content):
+            for member in _TS_MEMBER_PATTERN.finditer(match.group(2)):
+                symbols.constants[f"{match.group(1)}.{member.group(1)}"] = SymbolIndex._literal(member, 2)
+
+        for match in _TS_IMPORT_PATTERN.finditer(content):
+            clause, spec = match.group(1).strip(), match.group(2)
+            namespace = re.search(r'\*\s*as\s+(\w+)', clause)
+            if namespace:
+                symbols.imports[namespace.group(1)] = (spec, '*')
+            named = re.search(r'\{([^}]*)\}', clause)
+            if named:
+                SymbolIndex._add_named_imports(symbols.imports, named.group(1), spec)
+            default = re.match(r'(?:type\s+)?(\w+)\s*(?:,|$)', clause)
+            if default and default.group(1) != 'type':
+                symbols.imports[default.group(1)] = (spec, 'default')
+
+        for match in _TS_REEXPORT_PATTERN.finditer(content):
+            if match.group(1) is None:
+                symbols.star_exports.append(match.group(2))
+            else:
+                SymbolIndex._add_named_imports(symbols.imports, match.group(1), match.group(2))
+
+    @staticmethod
+    def _add_named_imports(imports: Dict[str, Tuple[str, str]], names: str, spec: str):
+        for item in names.split(','):
+            parts = item.replace('type ', '').split(' as ')
+            exported = parts[0].strip()
+            local = parts[-1].strip()
+            if exported and local:
+                imports[local] = (spec, exported)
+
+    @staticmethod
+    def _parse_python(symbols: FileSymbols, content: str):
+        enum_name = None
+        for line in content.split('\n'):
+            if enum_name and line[:1] in (' ', '\t'):
+                member = _PY_CONST_PATTERN.match(line.strip())
+                if member:
+                    symbols.constants[f"{enum_name}.{member.group(1)}"] = SymbolIndex._literal(member, 2)
+                continue
+            enum_name = None
+
+            enum_match = _PY_ENUM_PATTERN.match(line)
+            if enum_match:
+                enum_name = enum_match.group(1)
+                continue
+
+            const_match = _PY_CONST_PATTERN.match(line)
+            if const_match:
+                symbols.constants[const_match.group(1)] = SymbolIndex._literal(const_match, 2)
+                continue
+
+            import_match = _PY_IMPORT_PATTERN.match(line)
+            if import_match:
+                spec = import_match.group(1)
+                SymbolIndex._add_named_imports(symbols.imports, import_match.group(2).strip('() '), spec)
+
+    def resolve(self, rel_path: str, identifier: str) -> Any:
+        """解析文件中标识符（可带一级成员访问，如 MODELS.TEXT）的字面量值，无法解析返回 None"""
+        return self._lookup(rel_path, identifier)[0]
+
+    def _lookup(self, rel_path: str, identifier: str) -> Tuple[Any, FrozenSet[str]]:
+        key = (rel_path, identifier)
+        entry = self._resolved.get(key)
+        if entry is None:
+            entry = self._resolved[key] = self._compute(self.files.get(rel_path), identifier)
+        return entry
+
+    def _compute(self, symbols: Optional[FileSymbols], identifier: str) -> Tuple[Any, FrozenSet[str]]:
+        visited: Set[str] = set()
+        value = self._resolve_in(symbols, identifier, self._MAX_HOPS, visited) if symbols else None
+        return value, frozenset(visited)
+
+    def _resolve_in(self, symbols: FileSymbols, identifier: str, hops: int, visited: Set[str]) -> Any:
+        if hops <= 0:
+            return None
+        visited.add(symbols.module)
+        if identifier in symbols.constants:
+            return symbols.constants[identifier]
+
+        head, _, member = identifier.partition('.')
+        if head in symbols.imports:
+            spec, exported = symbols.imports[head]
+            target = self._module_for(symbols.module, spec, visited)
+            if target is None:
+                return None
+            if exported == '*':
+                return self._resolve_in(target, member, hops - 1, visited) if member else None
+            return self._resolve_in(target, f"{exported}.{member}" if member else exported, hops - 1, visited)
+
+        for spec in symbols.star_exports:
+            target = self._module_for(symbols.module, spec, visited)
+            if target is not None:
+                value = self._resolve_in(target, identifier, hops - 1, visited)
+                if value is not None:
+                    return value
+        return None
+
+    def _module_for(self, from_module: str, spec: str, visited: Set[str]) -> Optional[FileSymbols]:
+        """将导入说明符解析为已索引的模块，查找的模块键（无论是否命中）记入 visited"""
+        if spec.startswith('.') and not spec.startswith('./') and not spec.startswith('../') and '/' not in spec:
+            # Python 相对导入: .constants / ..config.models
+            level = len(spec) - len(spec.lstrip('.'))
+            base = Path(from_module).parents[level - 1] if level <= len(Path(from_module).parents) else Path('.')
+            candidate = (base / spec[level:].replace('.', '/')).as_posix()
+        elif spec.startswith('.'):
+            candidate = os.path.normpath((Path(from_module).parent / spec).as_posix()).replace(os.sep, '/')
+        elif spec.startswith('@/') or spec.startswith('~/'):
+            candidate = 'src/' + spec[2:]
+        else:
+            # Python 绝对导入 (pkg.module) 或 TS 路径别名
+            candidate = spec.replace('.', '/') if '/' not in spec else spec
+
+        for suffix in self._TS_EXTENSIONS:
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)]
+                break
+        visited.add(candidate)
+        return self._module(candidate)
+
+    def _module(self, key: str) -> Optional[FileSymbols]:
+        return self._modules.get(key)
+
+
+class _SymbolOverlay(SymbolIndex):
+    """在共享索引上叠加单个文件（未保存的缓冲区）的只读视图
+
+    被替换的文件优先查叠加的符号表，其余委托给共享索引。
+    解析过程没有查找被替换模块的结果与共享索引一致，读写共享缓存；
+    其余结果只缓存在本视图中，随视图一起丢弃。
+    """
+
+    def __init__(self, base: SymbolIndex, rel_path: str, symbols: FileSymbols):
+        self._base = base
+        self._rel_path = rel_path
+        self._symbols = symbols
+        self._replaced = base.files.get(rel_path)
+        # 被替换文件的模块键及目录索引别名
+        self._keys = {symbols.module}
+        for index_name in ('/index', '/__init__'):
+            if symbols.module.endswith(index_name):
+                self._keys.add(symbols.module[:-len(index_name)])
+        self._resolved = {}
+
+    @property
+    def files(self) -> Dict[str, FileSymbols]:
+        return self._base.files
+
+    def _lookup(self, rel_path: str, identifier: str) -> Tuple[Any, FrozenSet[str]]:
+        key = (rel_path, identifier)
+        entry = self._resolved.get(key)
+        if entry is not None:
+            return entry
+        if rel_path == self._rel_path:
+            entry = self._resolved[key] = self._compute(self._symbols, identifier)
+            return entry
+
+        entry = self._base._resolved.get(key)
+        if entry is not None and not entry[1] & self._keys:
+            return entry
+        entry = self._compute(self._base.files.get(rel_path), identifier)
+        if entry[1] & self._keys:
+            self._resolved[key] = entry
+        else:
+            self._base._resolved[key] = entry
+        return entry
+
+    def _module(self, key: str) -> Optional[FileSymbols]:
+        found = self._base._modules.get(key)
+        if key in self._keys and (key == self._symbols.module or found is None or found is self._replaced):
+            return self._symbols
+        return found
+
+
+@dataclass
+class Violation:
+    """请求参数校验问题"""
+    path: str  # 如 generationConfig.imageConfig.aspectRatio
+    message: str
+    severity: str = 'error'  # error: 与配置的取值或上限冲突，API 很可能拒绝；warning: 该模型未声明，可能不受支持
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"path": self.path, "message": self.message, "severity": self.severity}
+
+
+class RequestValidator:
+    """基于 gemini_models_config.json 的请求校验器
+
+    加载配置时将每个模型的 request_template* 编译为字段结构树，
+    将 thinking_levels / aspect_ratios / image_sizes / voices 编译为集合。
+    校验时只遍历一次请求体，无正则、无重复解析。
+    字段名按去下划线、忽略大小写比较（REST 接口同时接受 snake_case 与 camelCase）。
+    """
+
+    # 结构树中的通配节点: 模板中该位置是 {{placeholder}}，接受任意值
+    ANY = None
+    # 所有模型都接受的通用字段（分析器生成请求体时也会用到），合并进每个模型的结构树
+    _GENERIC_TEMPLATE = {
+        'contents': [{
+            'role': '{{role}}',
+            'parts': [{'text': '{{text}}'}, {'inline_data': {'mime_type': '{{mime_type}}', 'data': '{{data}}'}}],
+        }],
+        'generationConfig': {
+            'temperature': '{{temperature}}', 'topP': '{{top_p}}', 'topK': '{{top_k}}',
+            'maxOutputTokens': '{{max_output_tokens}}', 'candidateCount': '{{candidate_count}}',
+            'stopSequences': '{{stop_sequences}}', 'seed': '{{seed}}',
+            'responseMimeType': '{{mime_type}}', 'responseJsonSchema': '{{schema}}',
+            'thinkingConfig': {'thinkingLevel': '{{level}}', 'thinkingBudget': '{{budget}}', 'includeThoughts': '{{include}}'},
+        },
+    }
+    # 图片生成类模型额外接受的字段
+    _IMAGE_TEMPLATE = {
+        'generationConfig': {
+            'responseModalities': '{{modalities}}',
+            'imageConfig': {'aspectRatio': '{{aspect_ratio}}', 'imageSize': '{{image_size}}'},
+        },
+    }
+
+    def __init__(self, model_configs: Dict[str, 'ModelConfig']):
+        # 所有模型模板的并集: 请求体中出现不在其中的字段视为拼写错误/无效字段
+        self._global_shape: Dict[str, Any] = {}
+        self._model_shapes: Dict[str, Dict[str, Any]] = {}
+        self._enums: Dict[str, Dict[str, frozenset]] = {}
+        self._max_output: Dict[str, Optional[int]] = {}
+
+        for model_id, config in model_configs.items():
+            shape: Dict[str, Any] = {}
+            for template in config.request_templates.values():
+                self._merge(shape, template)
+                self._merge(self._global_shape, template)
+            self._merge(shape, self._GENERIC_TEMPLATE)
+            if 'image' in config.category:
+                self._merge(shape, self._IMAGE_TEMPLATE)
+            self._model_shapes[model_id] = shape
+
+            self._enums[model_id] = {
+                'thinkingLevel': frozenset(level.lower() for level in config.thinking_levels),
+                'aspectRatio': frozenset(config.aspect_ratios),
+                'imageSize': frozenset(config.image_sizes),
+                'voiceName': frozenset(config.voices),
+            }
+            self._max_output[model_id] = config.max_output_tokens
+
+        self._merge(self._global_shape, self._GENERIC_TEMPLATE)
+        self._merge(self._global_shape, self._IMAGE_TEMPLATE)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.replace('_', '').lower()
+
+    def _merge(self, shape: Dict[str, Any], template: Any):
+        """将模板合并进结构树；列表元素合并到 "[]" 节点"""
+        for name, value in template.items():
+            key = self._key(name)
+            if isinstance(value, str) and value.startswith('{{'):
+                shape[key] = self.ANY
+            elif isinstance(value, dict):
+                child = shape.get(key, {})
+                if child is not self.ANY:
+                    self._merge(child, value)
+                    shape[key] = child
+            elif isinstance(value, list):
+                child = shape.get(key, {})
+                if child is not self.ANY:
+                    items = child.setdefault('[]', {})
+                    for item in value:
+                        if isinstance(item, dict) and items is not self.ANY:
+                            self._merge(items, item)
+                        else:
+                            child['[]'] = items = self.ANY
+                    shape[key] = child
+            else:
+                shape.setdefault(key, self.ANY)
+
+    def validate(self, model: str, params: Dict[str, Any], body: Optional[Dict[str, Any]]) -> List[Violation]:
+        """校验单个调用的提取参数和生成的请求体"""
+        violations: List[Violation] = []
+        if body is not None:
+            if not body.get('contents') or not all(c.get('parts') for c in body['contents'] if isinstance(c, dict)):
+                violations.append(Violation('contents', "缺少 contents[].parts"))
+            self._walk(body, self._global_shape, self._model_shapes.get(model, {}), '', violations)
+
+        enums = self._enums.get(model, {})
+        generation = (body or {}).get('generationConfig', {})
+        checks = [
+            ('thinkingConfig.thinkingLevel', 'thinkingLevel', params.get('thinkingConfig', {}).get('thinkingLevel'),
+             generation.get('thinkingConfig', {}).get('thinkingLevel'), str.lower),
+            ('imageConfig.aspectRatio', 'aspectRatio', params.get('imageConfig', {}).get('aspectRatio'),
+             generation.get('imageConfig', {}).get('aspectRatio'), None),
+            ('imageConfig.imageSize', 'imageSize', params.get('imageConfig', {}).get('imageSize'),
+             generation.get('imageConfig', {}).get('imageSize'), None),
+            ('voiceConfig.voiceName', 'voiceName', params.get('voiceConfig', {}).get('voiceName'),
+             generation.get('speechConfig', {}).get('voiceConfig', {}).get('prebuiltVoiceConfig', {}).get('voiceName'), None),
+        ]
+        for path, enum_name, param_value, body_value, normalize in checks:
+            allowed = enums.get(enum_name)
+            if not allowed:
+                continue
+            for value in {param_value, body_value} - {None}:
+                if (normalize(value) if normalize else value) not in allowed:
+                    violations.append(Violation(path, f"{value!r} 不在 {model} 支持的取值中: {', '.join(sorted(allowed))}"))
+
+        temperature = params.get('temperature', generation.get('temperature'))
+        if temperature is not None and not (isinstance(temperature, (int, float)) and 0 <= temperature <= 2):
+            violations.append(Violation('temperature', f"temperature 应在 0~2 之间，实际为 {temperature!r}"))
+
+        max_tokens = params.get('maxOutputTokens', generation.get('maxOutputTokens'))
+        if max_tokens is not None:
+            limit = self._max_output.get(model)
+            if not isinstance(max_tokens, int) or max_tokens <= 0:
+                violations.append(Violation('maxOutputTokens', f"maxOutputTokens 应为正整数，实际为 {max_tokens!r}"))
+            elif limit and max_tokens > limit:
+                violations.append(Violation('maxOutputTokens', f"maxOutputTokens={max_tokens} 超过 {model} 的输出上限 {limit}"))
+
+        return violations
+
+    def _walk(self, value: Any, shape: Any, model_shape: Any, path: str, violations: List[Violation]):
+        """同时对照全局结构和模型结构遍历请求体"""
+        if shape is self.ANY:
+            return
+        if isinstance(value, list):
+            for item in value:
+                self._walk(item, shape.get('[]', {}), model_shape.get('[]', {}) if isinstance(model_shape, dict) else self.ANY,
+                           f"{path}[]", violations)
+            return
+        if not isinstance(value, dict):
+            return
+
+        for name, child in value.items():
+            key = self._key(name)
+            child_path = f"{path}.{name}" if path else name
+            if key not in shape:
+                violations.append(Violation(child_path, "未知字段，所有模型模板中均未出现"))
+                continue
+            child_model_shape = self.ANY
+            if isinstance(model_shape, dict):
+                if key in model_shape:
+                    child_model_shape = model_shape[key]
+                elif model_shape:
+                    violations.append(Violation(child_path, "该模型的请求模板中未声明此字段", 'warning'))
+            self._walk(child, shape[key], child_model_shape, child_path, violations)
 
 
 class GeminiAnalyzer:
     """Gemini API 分析器"""
 
-    def __init__(self, project_root: Path, config_path: Optional[Path] = None):
+    def __init__(
+        self,
+        project_root: Path,
+        config_path: Optional[Path] = None,
+        max_file_bytes: int = MAX_FILE_BYTES,
+        max_line_length: int = MAX_LINE_LENGTH,
+        file_time_budget: float = FILE_TIME_BUDGET,
+        inline_bytes_threshold: int = INLINE_BYTES_THRESHOLD,
+        image_edge_threshold: int = IMAGE_EDGE_THRESHOLD,
+        input_image_edge: int = INPUT_IMAGE_EDGE,
+        array_image_count: int = ARRAY_IMAGE_COUNT,
+        input_audio_seconds: int = INPUT_AUDIO_SECONDS,
+    ):
         self.root = project_root
         self.api_calls: List[APICall] = []
         self.model_configs: Dict[str, ModelConfig] = {}
 
+        # 单文件扫描预算
+        self.max_file_bytes = max_file_bytes
+        self.max_line_length = max_line_length
+        self.file_time_budget = file_time_budget
+        # 被跳过或降级解析的文件: {"file", "action", "reason"}
+        self.degraded_files: List[Dict[str, Any]] = []
+
+        # 请求体积估算阈值
+        self.inline_bytes_threshold = inline_bytes_threshold
+        self.image_edge_threshold = image_edge_threshold
+        self.input_image_edge = input_image_edge
+        self.array_image_count = array_image_count
+        self.input_audio_seconds = input_audio_seconds
+
+        # 项目级符号索引（每次扫描重建）及按文件缓存的符号表: 相对路径 -> ((mtime_ns, size), 符号表)
+        self.symbol_index = SymbolIndex()
+        self._symbol_cache: Dict[str, Tuple[Tuple[int, int], FileSymbols]] = {}
+        # analyze_source 在当前线程内使用的叠加索引（包含未保存的缓冲区）及降级记录
+        self._local = threading.local()
+
         # 默认配置文件路径
         if config_path:
             self.config_path = config_path
@@ -84,6 +675,7 @@ class GeminiAnalyzer:
                     break
             self.config_path = found_path
 
+        self.validator = RequestValidator({})
         self._load_config()
 
     def _load_config(self):
@@ -109,9 +701,22 @@ class GeminiAnalyzer:
                     extract_path=model_data.get('extract_path', ''),
                     use_cases=model_data.get('use_cases', []),
                     keywords=model_data.get('keywords', []),
-                    default_params=model_data.get('default_params', {})
+                    default_params=model_data.get('default_params', {}),
+                    aspect_ratios=model_data.get('aspect_ratios', []),
+                    image_sizes=model_data.get('image_sizes', []),
+                    request_templates={
+                        key[len('request_template'):].lstrip('_') or 'default': value
+                        for key, value in model_data.items()
+                        if key.startswith('request_template') and isinstance(value, dict)
+                    },
+                    thinking_levels=list(model_data.get('thinking_levels', {})),
+                    voices=[v['name'] if isinstance(v, dict) else v for v in model_data.get('voices', [])],
+                    max_output_tokens=model_data.get('context_window', {}).get('output')
                 )
 
+            # 模板与枚举只在加载时编译一次
+            self.validator = RequestValidator(self.model_configs)
+
             print(f"✅ 加载了 {len(self.model_configs)} 个模型配置")
         except FileNotFoundError:
             print(f"⚠️  配置文件未找到: {self.config_path}")
@@ -121,28 +726,30 @@ class GeminiAnalyzer:
     def scan(self) -> List[APICall]:
         """扫描源代码找出API调用"""
         calls = []
+        self.degraded_files = []
+        sources = []
 
         # 扫描 TypeScript/JavaScript 文件
         for ts_file in self.root.rglob('*.ts*'):
             if any(x in str(ts_file) for x in ['node_modules', '.agent', 'dist', 'build']):
                 continue
-            try:
-                content = ts_file.read_text(encoding='utf-8')
-                file_calls = self._parse_file(ts_file, content)
-                calls.extend(file_calls)
-            except Exception as e:
-                print(f"⚠️  {ts_file}: {e}")
+            source = self._read_source(ts_file)
+            if source is not None:
+                sources.append((ts_file, source, self._parse_file))
 
         # 扫描 Python 文件
         for py_file in self.root.rglob('*.py'):
             if any(x in str(py_file) for x in ['node_modules', '.agent', 'venv', '__pycache__']):
                 continue
-            try:
-                content = py_file.read_text(encoding='utf-8')
-                file_calls = self._parse_python_file(py_file, content)
-                calls.extend(file_calls)
-            except Exception as e:
-                print(f"⚠️  {py_file}: {e}")
+            source = self._read_source(py_file)
+            if source is not None:
+                sources.append((py_file, source, self._parse_python_file))
+
+        # 先建立符号索引，再逐文件分析，使跨文件的常量/枚举/导入都可解析
+        self.symbol_index = self._build_symbol_index(sources)
+
+        for file_path, (content, _), parser in sources:
+            calls.extend(self._scan_file(file_path, content, parser))
 
         # 去重
         seen = set()
@@ -153,21 +760,133 @@ class GeminiAnalyzer:
                 seen.add(key)
                 unique.append(c)
 
+        for c in unique:
+            c.payload = self.estimate_payload(c)
+        self.validate_calls(unique)
+
         self.api_calls = unique
         return unique
 
-    def _parse_file(self, file_path: Path, content: str) -> List[APICall]:
+    def analyze_source(self, rel_path: str, content: str) -> Tuple[List[APICall], List[Dict[str, Any]]]:
+        """分析内存中的源码（如编辑器未保存的缓冲区），不读写磁盘
+
+        返回 (调用列表, 本次被跳过或降级解析的记录)。
+        缓冲区自身的符号以叠加视图的形式覆盖项目符号索引，仅对本次调用可见；
+        不修改 api_calls / degraded_files，可在多个线程中并发调用
+        （共享索引只会写入与缓冲区无关的解析缓存）。
+        """
+        file_path = self.root / rel_path
+        degraded: List[Dict[str, Any]] = []
+        self._local.degraded = degraded
+        try:
+            if len(content.encode('utf-8')) > self.max_file_bytes:
+                self._record_degraded(file_path, 'skipped', f'文件过大 (> {self.max_file_bytes} bytes)')
+                return [], degraded
+
+            parser = self._parse_python_file if rel_path.endswith('.py') else self._parse_file
+            rel_key = str(file_path.relative_to(self.root))
+            self._local.symbol_index = self.symbol_index.overlay(rel_key, SymbolIndex.parse(rel_key, content))
+            calls = self._scan_file(file_path, content, parser)
+        finally:
+            self._local.symbol_index = None
+            self._local.degraded = None
+
+        seen = set()
+        unique = []
+        for c in calls:
+            if c.function not in seen:
+                seen.add(c.function)
+                c.payload = self.estimate_payload(c)
+                unique.append(c)
+        self.validate_calls(unique)
+        return unique, degraded
+
+    def _resolve_symbol(self, file_path: str, identifier: str) -> Any:
+        index = getattr(self._local, 'symbol_index', None) or self.symbol_index
+        return index.resolve(file_path, identifier)
+
+    def _read_source(self, file_path: Path) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """读取源文件，返回 (内容, (mtime_ns, size))；超出体积预算或读取失败返回 None"""
+        try:
+            stat = file_path.stat()
+            if stat.st_size > self.max_file_bytes:
+                self._record_degraded(file_path, 'skipped', f'文件过大 ({stat.st_size} bytes > {self.max_file_bytes})')
+                return None
+            return file_path.read_text(encoding='utf-8'), (stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            print(f"⚠️  {file_path}: {e}")
+            return None
+
+    def _build_symbol_index(self, sources) -> SymbolIndex:
+        """构建项目级符号索引，未变化的文件复用缓存的符号表"""
+        files = {}
+        for file_path, (content, stamp), _ in sources:
+            rel_path = str(file_path.relative_to(self.root))
+            cached = self._symbol_cache.get(rel_path)
+            if cached and cached[0] == stamp:
+                files[rel_path] = cached[1]
+                continue
+            symbols = SymbolIndex.parse(rel_path, content)
+            self._symbol_cache[rel_path] = (stamp, symbols)
+            files[rel_path] = symbols
+
+        # 清理已删除文件的缓存
+        for rel_path in set(self._symbol_cache) - set(files):
+            del self._symbol_cache[rel_path]
+        return SymbolIndex(files)
+
+    def _scan_file(self, file_path: Path, content: str, parser) -> List[APICall]:
+        """在行宽/时间预算内解析单个文件，超出预算时降级"""
+        try:
+            longest = max((len(line) for line in content.split('\n')), default=0)
+            if longest > self.max_line_length:
+                self._record_degraded(file_path, 'fallback', f'存在超长行 ({longest} 字符 > {self.max_line_length})')
+                return self._parse_fallback(file_path, content)
+
+            deadline = time.perf_counter() + self.file_time_budget
+            try:
+                return parser(file_path, content, deadline)
+            except _BudgetExceeded:
+                self._record_degraded(file_path, 'fallback', f'解析超时 (> {self.file_time_budget}s)')
+                return self._parse_fallback(file_path, content)
+        except Exception as e:
+            print(f"⚠️  {file_path}: {e}")
+            return []
+
+    def _record_degraded(self, file_path: Path, action: str, reason: str):
+        """记录被跳过或降级解析的文件（analyze_source 中记入本次调用的列表）"""
+        sink = getattr(self._local, 'degraded', None)
+        (self.degraded_files if sink is None else sink).append({
+            "file": str(file_path.relative_to(self.root)),
+            "action": action,
+            "reason": reason
+        })
+        print(f"⚠️  {file_path}: {reason}，{'已跳过' if action == 'skipped' else '已降级为安全解析'}")
+
+    @staticmethod
+    def _check_deadline(deadline: Optional[float]):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _BudgetExceeded()
+
+    @staticmethod
+    def _line_index(content: str) -> List[int]:
+        """预先计算每行起始偏移，行号查询为 O(log n)"""
+        return [0] + [m.end() for m in re.finditer('\n', content)]
+
+    def _parse_file(self, file_path: Path, content: str, deadline: Optional[float] = None) -> List[APICall]:
         """解析TypeScript/JavaScript文件"""
         calls = []
+        line_starts = self._line_index(content)
 
         # 1. 查找导出的函数（一般函数和箭头函数）
-        for match in re.finditer(r'(?:export\s+)?(?:async\s+)?(?:function|const)\s+(\w+)\s*(?:=\s*(?:async\s*)?\s*\(([^)]*)\)|\(([^)]*)\))', content):
+        for match in _FUNCTION_PATTERN.finditer(content):
+            self._check_deadline(deadline)
             func_name = match.group(1)
             func_signature = match.group(2) or match.group(3) or ''
             func_start = match.end()
 
-            arrow_pos = content.find('=>', func_start)
-            if arrow_pos == -1 or arrow_pos > func_start + 500:
+            arrow_pos = content.find('=>', func_start, func_start + 502)
+            if arrow_pos == -1:
                 brace_pos = content.find('{', func_start)
             else:
                 brace_pos = content.find('{', arrow_pos)
@@ -175,10 +894,11 @@ class GeminiAnalyzer:
             if brace_pos == -1:
                 continue
 
-            calls.extend(self._extract_and_analyze_body(content, brace_pos, match.start(), func_name, func_signature, file_path))
+            calls.extend(self._extract_and_analyze_body(content, brace_pos, match.start(), func_name, func_signature, file_path, line_starts))
 
         # 2. 查找类方法或对象方法 (支持 async, static, public/private/protected 修饰符)
-        for match in re.finditer(r'(?:(?:public|private|protected|static)\s+)*(?:async\s+)?(\w+)\s*\(([^)]*)\)\s*(?::\s*[^{]+)?\s*\{', content):
+        for match in _METHOD_PATTERN.finditer(content):
+            self._check_deadline(deadline)
             func_name = match.group(1)
             # 过滤掉一些常见的控制流关键字被误认为函数名
             if func_name in ['if', 'for', 'while', 'switch', 'catch', 'function', 'constructor']:
@@ -186,11 +906,48 @@ class GeminiAnalyzer:
             
             func_signature = match.group(2) or ''
             brace_pos = match.end() - 1 
-            calls.extend(self._extract_and_analyze_body(content, brace_pos, match.start(), func_name, func_signature, file_path))
+            calls.extend(self._extract_and_analyze_body(content, brace_pos, match.start(), func_name, func_signature, file_path, line_starts))
+
+        return calls
+
+    def _parse_fallback(self, file_path: Path, content: str) -> List[APICall]:
+        """安全解析器：不做函数级匹配，仅以API锚点为中心截取固定窗口分析
+
+        只使用 str.find 和锚定在关键字上的正则，复杂度与文件大小线性相关，
+        用于超长行或解析超时的文件。
+        """
+        calls = []
+        line_starts = self._line_index(content)
+        rel_path = str(file_path.relative_to(self.root))
+        name_pattern = _FALLBACK_PY_NAME_PATTERN if file_path.suffix == '.py' else _FALLBACK_NAME_PATTERN
+
+        # 汇总所有锚点的位置，同一窗口内的多个锚点（如 URL 中同时出现
+        # generativelanguage 与 generateContent）只算一个调用
+        positions = []
+        for anchor in _FALLBACK_ANCHORS:
+            pos = content.find(anchor)
+            while pos != -1:
+                positions.append(pos)
+                pos = content.find(anchor, pos + len(anchor))
+
+        last = -_FALLBACK_WINDOW
+        for pos in sorted(positions):
+            if pos - last < _FALLBACK_WINDOW:
+                continue
+            last = pos
+            window_start = max(0, pos - _FALLBACK_WINDOW)
+            names = name_pattern.findall(content, window_start, pos)
+            func_name = names[-1] if names else f'<anonymous@{pos}>'
+            window = content[window_start:pos + _FALLBACK_WINDOW]
+            line_num = bisect_right(line_starts, pos)
+
+            call = self._analyze_function(func_name, window, rel_path, line_num)
+            if call:
+                calls.append(call)
 
         return calls
 
-    def _extract_and_analyze_body(self, content: str, brace_pos: int, match_start: int, func_name: str, func_signature: str, file_path: Path) -> List[APICall]:
+    def _extract_and_analyze_body(self, content: str, brace_pos: int, match_start: int, func_name: str, func_signature: str, file_path: Path, line_starts: Optional[List[int]] = None) -> List[APICall]:
         """提取函数体并分析API调用"""
         depth = 0
         body_end = brace_pos
@@ -204,10 +961,18 @@ class GeminiAnalyzer:
                     break
 
         func_body = content[brace_pos:body_end]
-        line_num = content[:match_start].count('\n') + 1
+        if line_starts is not None:
+            line_num = bisect_right(line_starts, match_start)
+        else:
+            line_num = content[:match_start].count('\n') + 1
 
         image_params = self._extract_image_params(func_signature)
-        call = self._analyze_function(func_name, func_body, str(file_path.relative_to(self.root)), line_num, image_params)
+        image_array_params = [
+            name for name in _ARRAY_PARAM_PATTERN.findall(func_signature) if name in image_params
+        ]
+        call = self._analyze_function(
+            func_name, func_body, str(file_path.relative_to(self.root)), line_num, image_params, image_array_params
+        )
         
         return [call] if call else []
 
@@ -218,13 +983,12 @@ class GeminiAnalyzer:
             return image_params
 
         # 方法1: 匹配参数名: 类型，其中类型包含 image/Image/reference/Reference 等关键词
-        param_matches = re.findall(r'(\w+)\s*:\s*(?:[^,\n]*?)([Ii]mage|[Rr]eference|Picture|Photo|File|Base64|Data)', func_signature)
-        for param_name, _ in param_matches:
+        for param_name in _IMAGE_PARAM_PATTERN.findall(func_signature):
             if param_name not in image_params:
                 image_params.append(param_name)
 
         # 方法2: 直接检查参数名是否包含相关关键词
-        all_params = re.findall(r'(\w+)\s*:', func_signature)
+        all_params = _PARAM_NAME_PATTERN.findall(func_signature)
         for param_name in all_params:
             if any(kw in param_name.lower() for kw in ['image', 'img', 'photo', 'picture', 'file', 'base64', 'data', 'reference', 'ref']):
                 if param_name not in image_params:
@@ -232,27 +996,33 @@ class GeminiAnalyzer:
 
         return image_params
 
-    def _parse_python_file(self, file_path: Path, content: str) -> List[APICall]:
+    def _parse_python_file(self, file_path: Path, content: str, deadline: Optional[float] = None) -> List[APICall]:
         """解析Python文件"""
         calls = []
+        lines = content.split('\n')
+        line_starts = self._line_index(content)
 
         # 查找函数定义
-        for match in re.finditer(r'^\s*(?:async\s+)?def\s+(\w+)\s*\(', content, re.M):
+        for match in _PY_DEF_PATTERN.finditer(content):
+            self._check_deadline(deadline)
             func_name = match.group(1)
-            func_start = match.end()
 
-            # 找到函数体（缩进级别）
-            lines_after = content[func_start:].split('\n')
+            # 找到函数体: 从 def 的下一行开始，到第一个缩进不超过 def 行的非空行为止，
+            # 每个函数只扫描自身的行，总耗时与文件大小线性相关（嵌套函数按层数重复）
+            def_line = bisect_right(line_starts, match.start()) - 1
+            def_indent = len(match.group(0)) - len(match.group(0).lstrip())
             func_lines = []
-            base_indent = len(lines_after[0]) - len(lines_after[0].lstrip()) if lines_after else 0
 
-            for line in lines_after[1:]:
-                if line.strip() and not line.startswith(base_indent * ' '):
+            for line_no in range(def_line + 1, len(lines)):
+                line = lines[line_no]
+                stripped = line.lstrip()
+                # 多行签名的收尾 "):" 与 def 同级，仍属于签名
+                if stripped and len(line) - len(stripped) <= def_indent and not stripped.startswith(')'):
                     break
                 func_lines.append(line)
 
             func_body = '\n'.join(func_lines)
-            line_num = content[:match.start()].count('\n') + 1
+            line_num = bisect_right(line_starts, match.start())
 
             call = self._analyze_function(func_name, func_body, str(file_path.relative_to(self.root)), line_num)
             if call:
@@ -260,7 +1030,7 @@ class GeminiAnalyzer:
 
         return calls
 
-    def _analyze_function(self, func_name: str, func_body: str, file_path: str, line_num: int, image_params: List[str] = None) -> Optional[APICall]:
+    def _analyze_function(self, func_name: str, func_body: str, file_path: str, line_num: int, image_params: List[str] = None, image_array_params: List[str] = None) -> Optional[APICall]:
         """分析函数体，检测API调用特征"""
 
         # 检测API调用标志
@@ -273,7 +1043,7 @@ class GeminiAnalyzer:
             return None
 
         # 优先检测显式的 model 赋值 (如 model = 'gemini-3-pro-preview')
-        explicit_model = self._extract_model_from_code(func_body)
+        explicit_model = self._extract_model_from_code(func_body, file_path)
 
         # 检测多模态特征
         # 注意：不使用 .lower() 以便匹配驼峰命名如 inlineData
@@ -291,7 +1061,7 @@ class GeminiAnalyzer:
         has_structured = 'json' in func_body.lower() and ('schema' in func_body.lower() or 'responsemime' in func_body.lower())
 
         # 提取参数
-        params = self._extract_params(func_body)
+        params = self._extract_params(func_body, file_path)
 
         # 匹配模型 - 优先使用显式声明的模型
         detected_model, matched_config = self._match_model(
@@ -311,17 +1081,22 @@ class GeminiAnalyzer:
             detected_model=detected_model,
             matched_config=matched_config,
             extracted_params=params,
-            image_params=image_params or []
+            image_params=image_params or [],
+            image_array_params=image_array_params or []
         )
 
-    def _extract_params(self, func_body: str) -> Dict[str, Any]:
-        """从函数体中提取参数"""
+    def _extract_params(self, func_body: str, file_path: Optional[str] = None) -> Dict[str, Any]:
+        """从函数体中提取参数（字面量优先，其次通过符号索引解析标识符）"""
         params = {}
 
         # 提取 temperature
         temp_match = re.search(r'.temperature\s*[:=]\s*([\d.]+)', func_body, re.I)
         if temp_match:
             params['temperature'] = float(temp_match.group(1))
+        else:
+            value = self._resolve_param(func_body, file_path, 'temperature')
+            if isinstance(value, (int, float)):
+                params['temperature'] = float(value)
 
         # 提取 maxOutputTokens
         tokens_match = re.search(r'.maxOutputTokens\s*[:=]\s*(\d+)', func_body, re.I)
@@ -346,6 +1121,10 @@ class GeminiAnalyzer:
         thinking_match = re.search(r'.thinkingLevel\s*[:=]\s*["\']([^"\']+)["\']', func_body, re.I)
         if thinking_match:
             params.setdefault('thinkingConfig', {})['thinkingLevel'] = thinking_match.group(1)
+        else:
+            value = self._resolve_param(func_body, file_path, 'thinkingLevel')
+            if isinstance(value, str):
+                params.setdefault('thinkingConfig', {})['thinkingLevel'] = value
 
         # 提取 voiceName
         voice_match = re.search(r'.voiceName\s*[:=]\s*["\']([^"\']+)["\']', func_body, re.I)
@@ -354,7 +1133,22 @@ class GeminiAnalyzer:
 
         return params
 
-    def _extract_model_from_code(self, func_body: str) -> Optional[str]:
+    def _resolve_param(self, func_body: str, file_path: Optional[str], key: str) -> Any:
+        """通过符号索引解析 `key: IDENT` / `key = IDENT` 中标识符的字面量值"""
+        if file_path is None:
+            return None
+        for match in re.finditer(r'\b' + key + _IDENTIFIER_VALUE, func_body, re.I):
+            value = self._resolve_symbol(file_path, self._strip_enum_value(match.group(1)))
+            if value is not None:
+                return value
+        return None
+
+    @staticmethod
+    def _strip_enum_value(identifier: str) -> str:
+        # Python 枚举: Models.PRO.value -> Models.PRO
+        return identifier[:-len('.value')] if identifier.endswith('.value') else identifier
+
+    def _extract_model_from_code(self, func_body: str, file_path: Optional[str] = None) -> Optional[str]:
         """从代码中提取显式声明的模型名称"""
         # 匹配 model = 'gemini-xxx' 或 model = "gemini-xxx"
         # 新增: 匹配 callGemini('gemini-xxx', ...) 模式
@@ -370,6 +1164,14 @@ class GeminiAnalyzer:
             if match:
                 return match.group(1)
 
+        # 通过符号索引解析常量/枚举/导入: model: MODELS.TEXT、callGemini(DEFAULT_MODEL, ...)
+        if file_path is not None:
+            for pattern in _MODEL_IDENTIFIER_PATTERNS:
+                for match in pattern.finditer(func_body):
+                    value = self._resolve_symbol(file_path, self._strip_enum_value(match.group(1)))
+                    if isinstance(value, str) and value.lower().startswith('gemini-'):
+                        return value
+
         return None
 
     def _match_model(
@@ -410,33 +1212,38 @@ class GeminiAnalyzer:
         # 默认使用通用模型
         return 'gemini-2.0-flash-exp', self.model_configs.get('gemini-2.0-flash-exp')
 
-    def get_rest_example(self, call: APICall) -> str:
-        """生成REST调用示例"""
-        if not call.matched_config:
-            return "# 未匹配到模型配置"
+    def get_rest_path(self, call: APICall) -> str:
+        """生成REST请求路径，如 /v1beta/models/gemini-2.5-flash:generateContent"""
+        config = call.matched_config
+        return f"/{config.api_version}/models/{call.detected_model}:{config.endpoint}"
 
+    def get_request_body(self, call: APICall) -> Dict[str, Any]:
+        """构建REST请求体"""
         config = call.matched_config
-        api_version = config.api_version
-        base_url = "https://generativelanguage.googleapis.com"
-        endpoint = config.endpoint
-        model = call.detected_model
 
-        # 构建请求体
         if call.has_tts:
-            request_body = self._build_tts_request(call)
+            return self._build_tts_request(call)
         elif call.has_image and ('image' in config.category or call.image_params):
-            request_body = self._build_image_request(call)
+            return self._build_image_request(call)
         elif call.has_structured:
-            request_body = self._build_structured_request(call)
+            return self._build_structured_request(call)
         else:
-            request_body = self._build_default_request(call)
+            return self._build_default_request(call)
+
+    def get_rest_example(self, call: APICall) -> str:
+        """生成REST调用示例"""
+        if not call.matched_config:
+            return "# 未匹配到模型配置"
+
+        base_url = "https://generativelanguage.googleapis.com"
+        request_body = self.get_request_body(call)
 
         # 格式化为 JSON
         json_str = json.dumps(request_body, indent=2, ensure_ascii=False)
         json_safe = json_str.replace("'", "'\\''")
 
         return f'''curl -s -X POST \\
-  "{base_url}/{api_version}/models/{model}:{endpoint}" \\
+  "{base_url}{self.get_rest_path(call)}" \\
   -H "x-goog-api-key: $GEMINI_API_KEY" \\
   -H "Content-Type: application/json" \\
   -d '{json_safe}'
@@ -548,6 +1355,181 @@ class GeminiAnalyzer:
         response = call.matched_config.response_example
         return json.dumps(response, indent=2, ensure_ascii=False)
 
+    def estimate_payload(self, call: APICall) -> Optional[PayloadEstimate]:
+        """估算单次调用的请求/响应体积与 token 数
+
+        输入图片张数按 call.image_params 计（数组参数按 array_image_count 张），
+        尺寸按 input_image_edge 的正方形估算，与输出的 imageSize 无关。
+        输出图片尺寸取自 imageConfig，其次是模型 default_params，再次是 image_sizes 中最小的一档。
+        音频输入（非 TTS）按 input_audio_seconds 秒的 16kHz WAV 估算；视频输入不估算，只给出提示。
+        内联数据按 base64 的 4/3 膨胀计算。
+        """
+        if not call.matched_config:
+            return None
+
+        config = call.matched_config
+        body = self.get_request_body(call)
+        body_json = json.dumps(body, ensure_ascii=False)
+        estimate = PayloadEstimate()
+
+        # 请求: 请求体中的图片占位符替换为全部输入图片的 inline_data
+        placeholders = body_json.count(_IMAGE_PLACEHOLDER)
+        request_bytes = len(body_json.encode('utf-8')) - placeholders * len(_IMAGE_PLACEHOLDER)
+        if placeholders:
+            estimate.image_count = max(placeholders, sum(
+                self.array_image_count if name in call.image_array_params else 1
+                for name in call.image_params
+            ))
+            estimate.image_dimensions = (self.input_image_edge, self.input_image_edge)
+            # 多出的图片各占一个 inline_data part
+            part_json = json.dumps({"inline_data": {"mime_type": "image/jpeg", "data": ""}})
+            request_bytes += (estimate.image_count - placeholders) * (len(part_json) + 2)
+        width, height = estimate.image_dimensions
+        estimate.inline_bytes = estimate.image_count * self._base64_size(int(width * height * _JPEG_BYTES_PER_PIXEL))
+        text_tokens = sum(len(text) for text in re.findall(r'"text":\s*"([^"]*)"', body_json)) // 4
+        estimate.request_tokens = text_tokens + estimate.image_count * self._image_tokens(width, height)
+
+        # 音频输入（TTS 的音频在响应中）: 额外一个 inline_data part
+        if call.has_audio and not call.has_tts:
+            estimate.audio_seconds = self.input_audio_seconds
+            estimate.inline_bytes += self._base64_size(_AUDIO_INPUT_BYTES_PER_SECOND * estimate.audio_seconds)
+            request_bytes += len(json.dumps({"inline_data": {"mime_type": "audio/wav", "data": ""}})) + 2
+            estimate.request_tokens += _AUDIO_TOKENS_PER_SECOND * estimate.audio_seconds
+        estimate.request_bytes = request_bytes + estimate.inline_bytes
+
+        # 响应: 以 response_example 为骨架，图片/音频替换为估算的 base64 数据
+        response_json = json.dumps(config.response_example, ensure_ascii=False)
+        estimate.response_bytes = len(response_json.encode('utf-8'))
+        if 'image' in config.category:
+            estimate.output_dimensions = self._output_dimensions(call, config)
+            out_width, out_height = estimate.output_dimensions
+            estimate.response_bytes += self._base64_size(int(out_width * out_height * _PNG_BYTES_PER_PIXEL))
+        elif call.has_tts:
+            estimate.response_bytes += self._base64_size(_PCM_BYTES_PER_SECOND * _TTS_SECONDS)
+        usage = config.response_example.get('usageMetadata', {}) if isinstance(config.response_example, dict) else {}
+        estimate.response_tokens = usage.get('candidatesTokenCount', 0)
+
+        # 阈值检查
+        if estimate.request_bytes > INLINE_REQUEST_LIMIT:
+            estimate.recommendations.append(
+                f"请求体约 {self._format_bytes(estimate.request_bytes)}，超过 inline_data 上限 "
+                f"{self._format_bytes(INLINE_REQUEST_LIMIT)}，必须改用 File API 上传"
+            )
+        elif estimate.request_bytes > self.inline_bytes_threshold:
+            estimate.recommendations.append(
+                f"请求体约 {self._format_bytes(estimate.request_bytes)}，建议改用 File API 上传后以 file_data 引用"
+            )
+        if estimate.image_count and max(width, height) > self.image_edge_threshold:
+            estimate.recommendations.append(
+                f"输入图片长边约 {max(width, height)}px，建议在客户端缩放到 {self.image_edge_threshold}px 以内再编码"
+            )
+        if call.has_video:
+            estimate.recommendations.append("未估算视频输入体积；视频通常超过 inline_data 上限，建议使用 File API 上传")
+
+        return estimate
+
+    def _output_dimensions(self, call: APICall, config: ModelConfig) -> Tuple[int, int]:
+        """根据 imageConfig / 模型默认参数推算输出图片宽高
+
+        宽高比不在模型 aspect_ratios 中时（API 会拒绝），退回模型默认值，再退回 1:1 或列表第一项。
+        """
+        image_config = call.extracted_params.get('imageConfig', {})
+        image_size = image_config.get('imageSize') or config.default_params.get('imageSize')
+        if image_size not in _IMAGE_SIZE_PIXELS:
+            known = [s for s in config.image_sizes if s in _IMAGE_SIZE_PIXELS]
+            image_size = min(known, key=_IMAGE_SIZE_PIXELS.get) if known else '1K'
+        long_edge = _IMAGE_SIZE_PIXELS[image_size]
+
+        candidates = [image_config.get('aspectRatio'), config.default_params.get('aspectRatio'), '1:1']
+        if config.aspect_ratios:
+            candidates = [r for r in candidates if r in config.aspect_ratios] + config.aspect_ratios[:1]
+        aspect_ratio = next(r for r in candidates if isinstance(r, str) and r)
+        try:
+            w_ratio, h_ratio = (float(x) for x in aspect_ratio.split(':'))
+        except ValueError:
+            w_ratio, h_ratio = 1.0, 1.0
+        if w_ratio >= h_ratio:
+            return long_edge, round(long_edge * h_ratio / w_ratio)
+        return round(long_edge * w_ratio / h_ratio), long_edge
+
+    @staticmethod
+    def _base64_size(raw_bytes: int) -> int:
+        return (raw_bytes + 2) // 3 * 4
+
+    @staticmethod
+    def _image_tokens(width: int, height: int) -> int:
+        if width <= _IMAGE_SMALL_EDGE and height <= _IMAGE_SMALL_EDGE:
+            return _IMAGE_TILE_TOKENS
+        tiles = -(-width // _IMAGE_TILE) * -(-height // _IMAGE_TILE)
+        return tiles * _IMAGE_TILE_TOKENS
+
+    @staticmethod
+    def _format_bytes(size: int) -> str:
+        for unit in ('B', 'KB', 'MB'):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GB"
+
+    def validate_calls(self, calls: Optional[List[APICall]] = None) -> Dict[str, int]:
+        """批量校验调用的提取参数与生成的请求体，结果写入 call.violations
+
+        相同 (模型, 参数, 请求体) 的调用只校验一次。
+        """
+        if calls is None:
+            calls = self.api_calls
+
+        memo: Dict[Tuple[str, str], List[Violation]] = {}
+        for call in calls:
+            if not call.matched_config:
+                call.violations = []
+                continue
+            body = self.get_request_body(call)
+            key = (call.detected_model, json.dumps([call.extracted_params, body], sort_keys=True))
+            if key not in memo:
+                memo[key] = self.validator.validate(call.detected_model, call.extracted_params, body)
+            call.violations = memo[key]
+
+        return self.violation_totals(calls)
+
+    def violation_totals(self, calls: Optional[List[APICall]] = None) -> Dict[str, int]:
+        if calls is None:
+            calls = self.api_calls
+        all_violations = [v for c in calls for v in c.violations]
+        return {
+            "errors": sum(1 for v in all_violations if v.severity == 'error'),
+            "warnings": sum(1 for v in all_violations if v.severity == 'warning'),
+            "calls_with_errors": sum(1 for c in calls if any(v.severity == 'error' for v in c.violations))
+        }
+
+    def payload_totals(self) -> Dict[str, int]:
+        """汇总所有调用各执行一次时的体积估算"""
+        estimates = [c.payload for c in self.api_calls if c.payload]
+        return {
+            "request_bytes": sum(e.request_bytes for e in estimates),
+            "response_bytes": sum(e.response_bytes for e in estimates),
+            "bytes_per_invocation": sum(e.bytes_per_invocation for e in estimates),
+            "request_tokens": sum(e.request_tokens for e in estimates),
+            "flagged_calls": sum(1 for e in estimates if e.recommendations)
+        }
+
+    def _format_payload(self, est: PayloadEstimate) -> str:
+        parts = [f"请求 {self._format_bytes(est.request_bytes)}"]
+        inline = []
+        if est.image_count:
+            width, height = est.image_dimensions
+            inline.append(f"{est.image_count} 张 {width}x{height} 图片")
+        if est.audio_seconds:
+            inline.append(f"{est.audio_seconds} 秒音频")
+        if inline:
+            parts[0] += f" (含 {' + '.join(inline)}, base64 {self._format_bytes(est.inline_bytes)})"
+        parts.append(f"响应 {self._format_bytes(est.response_bytes)}")
+        if est.output_dimensions != (0, 0):
+            parts[-1] += f" (输出 {est.output_dimensions[0]}x{est.output_dimensions[1]} 图片)"
+        parts.append(f"每次调用 {self._format_bytes(est.bytes_per_invocation)}")
+        parts.append(f"~{est.request_tokens} 输入 / ~{est.response_tokens} 输出 tokens")
+        return " | ".join(parts)
+
     def print_report(self):
         """打印分析报告"""
         print("=" * 80)
@@ -584,6 +1566,16 @@ class GeminiAnalyzer:
             if call.extracted_params:
                 print(f"⚙️  参数: {json.dumps(call.extracted_params, ensure_ascii=False)}")
 
+            # 体积估算
+            if call.payload:
+                print(f"📦 体积估算: {self._format_payload(call.payload)}")
+                for tip in call.payload.recommendations:
+                    print(f"   ⚠️  {tip}")
+
+            # 参数校验
+            for v in call.violations:
+                print(f"{'❌' if v.severity == 'error' else '⚠️ '} 参数校验: {v.path}: {v.message}")
+
             print("\n### REST 调用示例")
             print(self.get_rest_example(call))
 
@@ -592,11 +1584,30 @@ class GeminiAnalyzer:
             print(self.get_response_example(call))
             print("```")
 
+        totals = self.payload_totals()
+        print(f"\n{'─' * 80}")
+        print(f"## 📦 体积汇总: 每轮调用约 {self._format_bytes(totals['bytes_per_invocation'])} "
+              f"(请求 {self._format_bytes(totals['request_bytes'])} / 响应 {self._format_bytes(totals['response_bytes'])})，"
+              f"{totals['flagged_calls']} 个调用需要优化")
+
+        violation_totals = self.violation_totals()
+        print(f"## 🧪 参数校验: {violation_totals['errors']} 个错误 / {violation_totals['warnings']} 个警告 "
+              f"({violation_totals['calls_with_errors']} 个调用存在错误级问题，请求可能被 API 拒绝)")
+
+        if self.degraded_files:
+            print(f"\n{'─' * 80}")
+            print(f"## ⚠️  超出扫描预算的文件 ({len(self.degraded_files)})")
+            for item in self.degraded_files:
+                action = '已跳过' if item['action'] == 'skipped' else '降级解析'
+                print(f"  - {item['file']}: {item['reason']} [{action}]")
+
     def generate_markdown(self) -> str:
         """生成Markdown报告"""
         lines = ["# Gemini API 分析报告\n"]
         lines.append(f"扫描时间: {Path(__file__).stat().st_mtime}\n")
         lines.append(f"发现 {len(self.api_calls)} 个API调用\n")
+        violation_totals = self.violation_totals()
+        lines.append(f"参数校验: {violation_totals['errors']} 个错误 / {violation_totals['warnings']} 个警告\n")
 
         # 模型统计
         model_count = {}
@@ -608,6 +1619,23 @@ class GeminiAnalyzer:
         for model, count in sorted(model_count.items(), key=lambda x: x[1], reverse=True):
             lines.append(f"| `{model}` | {count} |\n")
 
+        totals = self.payload_totals()
+        lines.append("\n## 请求体积估算\n")
+        lines.append("| 调用 | 模型 | 请求 | 响应 | 每次调用 | 请求 tokens | 建议 |\n|---|---|---|---|---|---|---|\n")
+        for call in self.api_calls:
+            if not call.payload:
+                continue
+            est = call.payload
+            lines.append(
+                f"| `{call.function}()` | `{call.detected_model}` | {self._format_bytes(est.request_bytes)} | "
+                f"{self._format_bytes(est.response_bytes)} | {self._format_bytes(est.bytes_per_invocation)} | "
+                f"{est.request_tokens} | {'⚠️' if est.recommendations else '-'} |\n"
+            )
+        lines.append(
+            f"| **合计** | | {self._format_bytes(totals['request_bytes'])} | {self._format_bytes(totals['response_bytes'])} | "
+            f"{self._format_bytes(totals['bytes_per_invocation'])} | {totals['request_tokens']} | {totals['flagged_calls']} |\n"
+        )
+
         lines.append("\n---\n\n## API 调用详情\n")
 
         for i, call in enumerate(self.api_calls, 1):
@@ -633,6 +1661,16 @@ class GeminiAnalyzer:
             if call.extracted_params:
                 lines.append(f"- **参数**: `{json.dumps(call.extracted_params, ensure_ascii=False)}`\n")
 
+            if call.payload:
+                lines.append(f"- **体积估算**: {self._format_payload(call.payload)}\n")
+                for tip in call.payload.recommendations:
+                    lines.append(f"  - ⚠️ {tip}\n")
+
+            if call.violations:
+                lines.append("- **参数校验**:\n")
+                for v in call.violations:
+                    lines.append(f"  - {'❌' if v.severity == 'error' else '⚠️'} `{v.path}`: {v.message}\n")
+
             lines.append("\n#### 推荐 REST 调用 (Standard)\n")
             lines.append("```bash\n")
             lines.append(self.get_rest_example(call))
@@ -645,45 +1683,65 @@ class GeminiAnalyzer:
 
             lines.append("\n---\n")
 
+        if self.degraded_files:
+            lines.append("\n## 超出扫描预算的文件\n\n")
+            lines.append("| 文件 | 处理 | 原因 |\n|---|---|---|\n")
+            for item in self.degraded_files:
+                action = '已跳过' if item['action'] == 'skipped' else '降级解析'
+                lines.append(f"| `{item['file']}` | {action} | {item['reason']} |\n")
+
         return "".join(lines)
 
+    def call_to_dict(self, call: APICall) -> Dict[str, Any]:
+        """将单个API调用转换为可序列化的字典"""
+        call_data = {
+            "function": call.function,
+            "file": call.file,
+            "line": call.line,
+            "detected_model": call.detected_model,
+            "features": {
+                "image": call.has_image,
+                "audio": call.has_audio,
+                "video": call.has_video,
+                "stream": call.has_stream,
+                "tts": call.has_tts,
+                "structured": call.has_structured
+            },
+            "extracted_params": call.extracted_params
+        }
+
+        if call.payload:
+            call_data["payload"] = call.payload.to_dict()
+
+        if call.violations:
+            call_data["violations"] = [v.to_dict() for v in call.violations]
+
+        if call.matched_config:
+            call_data["model_info"] = {
+                "name": call.matched_config.name,
+                "category": call.matched_config.category,
+                "description": call.matched_config.description,
+                "api_version": call.matched_config.api_version,
+                "endpoint": call.matched_config.endpoint
+            }
+
+        return call_data
+
     def to_json(self) -> str:
         """导出JSON"""
         data = {
             "summary": {
                 "total_calls": len(self.api_calls),
-                "models_used": list(set(c.detected_model for c in self.api_calls))
+                "models_used": list(set(c.detected_model for c in self.api_calls)),
+                "payload": self.payload_totals(),
+                "violations": self.violation_totals()
             },
-            "api_calls": []
+            "api_calls": [],
+            "degraded_files": self.degraded_files
         }
 
         for call in self.api_calls:
-            call_data = {
-                "function": call.function,
-                "file": call.file,
-                "line": call.line,
-                "detected_model": call.detected_model,
-                "features": {
-                    "image": call.has_image,
-                    "audio": call.has_audio,
-                    "video": call.has_video,
-                    "stream": call.has_stream,
-                    "tts": call.has_tts,
-                    "structured": call.has_structured
-                },
-                "extracted_params": call.extracted_params
-            }
-
-            if call.matched_config:
-                call_data["model_info"] = {
-                    "name": call.matched_config.name,
-                    "category": call.matched_config.category,
-                    "description": call.matched_config.description,
-                    "api_version": call.matched_config.api_version,
-                    "endpoint": call.matched_config.endpoint
-                }
-
-            data["api_calls"].append(call_data)
+            data["api_calls"].append(self.call_to_dict(call))
 
         return json.dumps(data, indent=2, ensure_ascii=False)
 
@@ -692,12 +1750,16 @@ class GeminiAnalyzer:
 # Vibe Agent 风格调用
 # ============================================
 
-def analyze(project_dir: str = None, config_path: str = None) -> GeminiAnalyzer:
+def analyze(project_dir: str = None, config_path: str = None, **options: Any) -> GeminiAnalyzer:
     """
     Vibe Agent 风格调用
 
+    options 原样传给 GeminiAnalyzer，如 inline_bytes_threshold / image_edge_threshold /
+    input_image_edge / array_image_count / input_audio_seconds。
+
     使用方式:
         analyzer = analyze()
+        analyzer = analyze(input_image_edge=4096)
         analyzer.print_report()
     """
     if project_dir is None:
@@ -714,7 +1776,8 @@ def analyze(project_dir: str = None, config_path: str = None) -> GeminiAnalyzer:
 
     analyzer = GeminiAnalyzer(
         project_root=Path(project_dir),
-        config_path=Path(config_path)
+        config_path=Path(config_path),
+        **options
     )
 
     print("🔍 扫描源代码...")
@@ -726,9 +1789,31 @@ def analyze(project_dir: str = None, config_path: str = None) -> GeminiAnalyzer:
 
 def main():
     """命令行入口"""
-    project_root = Path(__file__).parents[4]
-
-    analyzer = analyze(str(project_root))
+    parser = argparse.ArgumentParser(description="扫描项目中的 Gemini API 调用并生成报告")
+    parser.add_argument('--project', help="项目根目录（默认为本 Skill 所在仓库的根目录）")
+    parser.add_argument('--config', help="模型配置文件路径")
+    parser.add_argument('--inline-threshold-mb', type=float, default=INLINE_BYTES_THRESHOLD / 1024 / 1024,
+                        help="请求体超过该大小（MB）时建议改用 File API")
+    parser.add_argument('--image-edge-threshold', type=int, default=IMAGE_EDGE_THRESHOLD,
+                        help="输入图片长边超过该像素时建议客户端缩放")
+    parser.add_argument('--input-image-edge', type=int, default=INPUT_IMAGE_EDGE,
+                        help="估算时假设的输入图片长边像素")
+    parser.add_argument('--array-image-count', type=int, default=ARRAY_IMAGE_COUNT,
+                        help="数组类型图片参数按几张图片估算")
+    parser.add_argument('--input-audio-seconds', type=int, default=INPUT_AUDIO_SECONDS,
+                        help="音频输入按多少秒估算")
+    args = parser.parse_args()
+
+    project_root = Path(args.project) if args.project else Path(__file__).parents[4]
+
+    analyzer = analyze(
+        str(project_root), args.config,
+        inline_bytes_threshold=int(args.inline_threshold_mb * 1024 * 1024),
+        image_edge_threshold=args.image_edge_threshold,
+        input_image_edge=args.input_image_edge,
+        array_image_count=args.array_image_count,
+        input_audio_seconds=args.input_audio_seconds,
+    )
 
     # 生成报告
     output_dir = project_root
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Gemini REST 压测工具 - Vibe Agent 风格
+
+功能:
+1. 复用 gemini_api_analyzer 生成的 REST 请求（路径 + 请求体）
+2. 以可配置的并发数和速率回放，客户端使用 keep-alive 连接池
+3. 目标可以是 server-side/proxy.js，也可以是内置的本地桩服务
+   （按配置中的 response_example 返回，并模拟可配置的延迟）
+4. 按模型统计吞吐量与 p50/p95/p99 延迟
+
+全部基于标准库 asyncio，无需联网即可运行。
+
+使用方式:
+    # 启动内置桩服务并压测（完全离线）
+    python gemini_load_test.py --stub --requests 2000 --concurrency 50
+
+    # 压测已部署的代理（自签名证书加 --insecure）
+    python gemini_load_test.py --target https://localhost --insecure --rate 100
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import ssl
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from gemini_api_analyzer import APICall, GeminiAnalyzer, analyze
+
+
+@dataclass
+class ReplayRequest:
+    """一条待回放的请求"""
+    model: str
+    path: str
+    body: bytes
+
+
+@dataclass
+class ModelStats:
+    """单个模型的压测结果"""
+    requests: int = 0
+    latencies: List[float] = field(default_factory=list)  # 秒
+    errors: int = 0
+    status_codes: Dict[int, int] = field(default_factory=dict)
+
+
+def build_requests(analyzer: GeminiAnalyzer, calls: Optional[List[APICall]] = None) -> List[ReplayRequest]:
+    """将分析出的API调用转换为可回放的请求
+
+    未传入 calls 时使用 analyzer.api_calls；若项目中没有检测到调用，
+    则为配置中的每个模型各生成一条默认请求。
+    """
+    if calls is None:
+        calls = analyzer.api_calls
+    if not calls:
+        calls = [
+            APICall(function=model_id, file='<config>', line=0, detected_model=model_id, matched_config=config)
+            for model_id, config in analyzer.model_configs.items()
+        ]
+
+    requests = []
+    for call in calls:
+        if not call.matched_config:
+            continue
+        body = json.dumps(analyzer.get_request_body(call), ensure_ascii=False).encode('utf-8')
+        requests.append(ReplayRequest(call.detected_model, analyzer.get_rest_path(call), body))
+    return requests
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩百分位（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+# ============================================
+# HTTP/1.1 工具
+# ============================================
+
+async def _read_http_message(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str], bytes]:
+    """读取一条 HTTP/1.1 报文，返回 (首行, 头部, 正文)，支持 Content-Length 与 chunked"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return lines[0], headers, body
+
+
+# ============================================
+# 本地桩服务
+# ============================================
+
+class StubServer:
+    """按模型配置返回 response_example 的本地桩服务"""
+
+    def __init__(self, analyzer: GeminiAnalyzer, latency_ms: float = 50.0, jitter_ms: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: set = set()
+        self.connections = 0  # 已接受的连接数（用于确认客户端复用连接）
+        # 预先序列化响应，避免在请求路径上重复 json.dumps
+        self._responses = {
+            model_id: json.dumps(config.response_example, ensure_ascii=False).encode('utf-8')
+            for model_id, config in analyzer.model_configs.items()
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            for task in self._handlers:
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request_line, headers, _ = await _read_http_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                # 路径形如 /v1beta/models/{model}:{endpoint}
+                path = request_line.split(' ')[1] if ' ' in request_line else ''
+                model = path.rsplit('/', 1)[-1].split(':', 1)[0]
+                body = self._responses.get(model)
+                status = '200 OK' if body is not None else '404 Not Found'
+                if body is None:
+                    body = json.dumps({"error": {"code": 404, "message": f"model not found: {model}"}}).encode('utf-8')
+
+                delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+
+# ============================================
+# 连接池客户端
+# ============================================
+
+class ConnectionPool:
+    """固定大小的 HTTP/1.1 keep-alive 连接池"""
+
+    def __init__(self, base_url: str, size: int, insecure: bool = False, api_key: str = ''):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.use_tls = parts.scheme == 'https'
+        default_port = 443 if self.use_tls else 80
+        self.port = parts.port or default_port
+        # 非默认端口时 Host 头必须带端口
+        host = f"[{self.host}]" if ':' in self.host else self.host
+        self.host_header = host if self.port == default_port else f"{host}:{self.port}"
+        self.prefix = parts.path.rstrip('/')
+        self.api_key = api_key
+        self.ssl_context = None
+        if self.use_tls:
+            self.ssl_context = ssl.create_default_context()
+            if insecure:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)  # 连接按需建立
+
+    async def request(self, path: str, body: bytes) -> int:
+        """发送一条 POST 请求，返回状态码"""
+        conn = await self._idle.get()
+        try:
+            if conn is None:
+                conn = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+            reader, writer = conn
+
+            writer.write(
+                f"POST {self.prefix}{path} HTTP/1.1\r\nHost: {self.host_header}\r\n"
+                f"Content-Type: application/json\r\nx-goog-api-key: {self.api_key}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+            status_line, headers, _ = await _read_http_message(reader)
+
+            if headers.get('connection', '').lower() == 'close':
+                writer.close()
+                conn = None
+            parts = status_line.split(' ', 2)
+            if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+                raise ValueError(f"无效的状态行: {status_line[:100]!r}")
+            return int(parts[1])
+        except BaseException:
+            if conn is not None:
+                conn[1].close()
+            conn = None
+            raise
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        writers = []
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                conn[1].close()
+                writers.append(conn[1])
+        # 等待连接真正关闭，让服务端读到 EOF 后正常退出
+        await asyncio.gather(*(w.wait_closed() for w in writers), return_exceptions=True)
+
+
+# ============================================
+# 压测主流程
+# ============================================
+
+async def run_load(requests: List[ReplayRequest], base_url: str, total: int, concurrency: int,
+                   rate: float = 0.0, insecure: bool = False,
+                   api_key: str = '') -> Tuple[Dict[str, ModelStats], float, int]:
+    """按并发数和速率回放请求，返回 (按模型统计, 总耗时秒, 排队请求数)
+
+    rate > 0 时开环发送: 第 i 条请求在 started + i / rate 时刻发出，不等待前面的响应；
+    连接池满时请求排队，延迟从计划发送时刻算起，排队时间计入延迟（避免协调遗漏）。
+    rate = 0 时闭环发送: 以并发数为上限尽快发送，延迟从实际发送时刻算起。
+    排队请求数为开环模式下计划发送时连接已全部占用的请求数。
+    """
+    pool = ConnectionPool(base_url, concurrency, insecure=insecure, api_key=api_key)
+    stats: Dict[str, ModelStats] = {r.model: ModelStats() for r in requests}
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    in_flight = 0
+    queued = 0
+
+    async def one(req: ReplayRequest, scheduled: Optional[float]):
+        nonlocal in_flight
+        model_stats = stats[req.model]
+        model_stats.requests += 1
+        start = scheduled if scheduled is not None else time.perf_counter()
+        in_flight += 1
+        try:
+            status = await pool.request(req.path, req.body)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # 连接失败、响应被截断、头部超长或报文格式错误: 计为错误，不中断压测
+            model_stats.errors += 1
+            return
+        finally:
+            in_flight -= 1
+            if scheduled is None:
+                semaphore.release()
+        model_stats.latencies.append(time.perf_counter() - start)
+        model_stats.status_codes[status] = model_stats.status_codes.get(status, 0) + 1
+        if status >= 400:
+            model_stats.errors += 1
+
+    tasks = []
+    started = time.perf_counter()
+    try:
+        for i in range(total):
+            req = requests[i % len(requests)]
+            if rate > 0:
+                scheduled = started + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if in_flight >= concurrency:
+                    queued += 1
+                tasks.append(loop.create_task(one(req, scheduled)))
+            else:
+                await semaphore.acquire()
+                tasks.append(loop.create_task(one(req, None)))
+
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await pool.close()
+    return stats, elapsed, queued
+
+
+def format_report(stats: Dict[str, ModelStats], elapsed: float, rate: float = 0.0, queued: int = 0) -> str:
+    """生成压测结果表格"""
+    lines = [
+        f"{'模型':<36}{'请求':>8}{'错误':>8}{'吞吐(req/s)':>14}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}",
+        '─' * 96,
+    ]
+    total_ok = 0
+    total_err = 0
+    total_sent = 0
+    for model, s in sorted(stats.items()):
+        lat = sorted(s.latencies)
+        total_ok += len(lat)
+        total_err += s.errors
+        total_sent += s.requests
+        lines.append(
+            f"{model:<36}{s.requests:>8}{s.errors:>8}{len(lat) / elapsed if elapsed else 0:>14.1f}"
+            f"{percentile(lat, 50) * 1000:>10.1f}{percentile(lat, 95) * 1000:>10.1f}{percentile(lat, 99) * 1000:>10.1f}"
+        )
+    lines.append('─' * 96)
+    lines.append(f"总计: {total_ok} 个响应, {total_err} 个错误, 耗时 {elapsed:.2f}s, 吞吐 {total_ok / elapsed if elapsed else 0:.1f} req/s")
+    if rate > 0:
+        lines.append(f"速率: 目标 {rate:.1f} req/s, 实际完成 {total_ok / elapsed if elapsed else 0:.1f} req/s")
+        if queued:
+            lines.append(
+                f"⚠️  {queued}/{total_sent} 个请求在计划发送时连接池已满，延迟包含排队时间；"
+                f"如需测量目标本身的延迟，请提高 --concurrency"
+            )
+    return '\n'.join(lines)
+
+
+async def _main_async(args):
+    if args.from_config:
+        analyzer = GeminiAnalyzer(Path(args.project or '.'), Path(args.config) if args.config else None)
+    else:
+        analyzer = analyze(args.project, args.config)
+    requests = build_requests(analyzer, [] if args.from_config else None)
+    if not requests:
+        print("❌ 没有可回放的请求")
+        return
+
+    print(f"📦 回放 {len(requests)} 种请求: {', '.join(sorted(set(r.model for r in requests)))}")
+
+    stub = None
+    target = args.target
+    if args.stub or not target:
+        stub = StubServer(analyzer, latency_ms=args.latency, jitter_ms=args.jitter)
+        await stub.start()
+        target = stub.url
+        print(f"🧪 本地桩服务: {target} (延迟 {args.latency}ms ± {args.jitter}ms)")
+
+    print(f"🚀 目标: {target} | 请求数 {args.requests} | 并发 {args.concurrency} | 速率 {args.rate or '不限'}")
+    try:
+        stats, elapsed, queued = await run_load(
+            requests, target, args.requests, args.concurrency, rate=args.rate,
+            insecure=args.insecure, api_key=os.environ.get('GEMINI_API_KEY', '')
+        )
+    finally:
+        if stub:
+            await stub.stop()
+
+    print()
+    print(format_report(stats, elapsed, rate=args.rate, queued=queued))
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="回放分析器生成的 Gemini REST 请求进行压测")
+    parser.add_argument('--project', help="要扫描的项目目录（默认与 gemini_api_analyzer 相同）")
+    parser.add_argument('--config', help="模型配置文件路径")
+    parser.add_argument('--from-config', action='store_true', help="不扫描项目，为配置中每个模型生成一条请求")
+    parser.add_argument('--target', help="目标地址，如 https://localhost（proxy.js）；不填则使用本地桩服务")
+    parser.add_argument('--stub', action='store_true', help="启动内置桩服务作为目标")
+    parser.add_argument('--latency', type=float, default=50.0, help="桩服务基础延迟（毫秒）")
+    parser.add_argument('--jitter', type=float, default=0.0, help="桩服务延迟抖动上限（毫秒）")
+    parser.add_argument('--requests', type=int, default=1000, help="总请求数")
+    parser.add_argument('--concurrency', type=int, default=20, help="并发数（同时也是连接池大小）")
+    parser.add_argument('--rate', type=float, default=0.0, help="每秒请求数（开环，延迟含排队时间），0 表示不限速")
+    parser.add_argument('--insecure', action='store_true', help="跳过 HTTPS 证书校验（自签名证书）")
+    args = parser.parse_args()
+
+    asyncio.run(_main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+JSON-RPC 常驻服务回归: analyzeBuffer、缓存命中、降级记录、通知不响应
+
+用法:
+    pytest test_analyzer_server.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_analyzer_server import AnalyzerServer  # noqa: E402
+from gemini_api_analyzer import GeminiAnalyzer  # noqa: E402
+
+
+_BUFFER = """import { MODEL } from './models';
+export async function callApi() {
+  return fetch('generateContent', { model: MODEL });
+}
+"""
+
+
+def test_server_analyze_buffer(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'models.ts').write_text("export const MODEL = 'gemini-2.5-flash';\n", encoding='utf-8')
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None, max_line_length=200)
+    analyzer.scan()
+    server = AnalyzerServer(analyzer)
+
+    def analyze(content, request_id=1):
+        return server.handle({
+            'jsonrpc': '2.0', 'id': request_id, 'method': 'analyzeBuffer',
+            'params': {'path': 'src/api.ts', 'content': content},
+        })
+
+    first = analyze(_BUFFER)
+    assert first['id'] == 1
+    result = first['result']
+    assert [c['detected_model'] for c in result['calls']] == ['gemini-2.5-flash']
+    assert result['degraded'] == [] and result['cached'] is False
+
+    # 相同内容命中缓存
+    second = analyze(_BUFFER, request_id=2)['result']
+    assert second['cached'] is True
+    assert second['calls'] == result['calls']
+    assert server.cache.hits == 1
+
+    # 降级记录随结果返回，不写入分析器的 degraded_files
+    degraded = analyze('// ' + 'x' * 500 + '\n' + _BUFFER)['result']['degraded']
+    assert [d['action'] for d in degraded] == ['fallback']
+    assert analyzer.degraded_files == []
+
+
+def test_server_notifications_get_no_response(tmp_path):
+    server = AnalyzerServer(GeminiAnalyzer(tmp_path, config_path=None))
+
+    assert server.handle({'jsonrpc': '2.0', 'method': 'stats'}) is None
+    assert server.handle({'jsonrpc': '2.0', 'method': 'missing'}) is None
+    assert server.handle({'jsonrpc': '2.0', 'method': 'analyzeBuffer', 'params': {}}) is None
+    assert server.handle({'jsonrpc': '2.0', 'id': 3, 'method': 'missing'})['error']['code'] == -32601
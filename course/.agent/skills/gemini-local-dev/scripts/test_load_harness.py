@@ -0,0 +1,104 @@
+"""
+压测工具回归: 百分位、桩服务、连接池复用、闭环 / 开环两种发送模式
+
+用法:
+    pytest test_load_harness.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_api_analyzer import GeminiAnalyzer  # noqa: E402
+from gemini_load_test import (  # noqa: E402
+    ConnectionPool,
+    StubServer,
+    build_requests,
+    percentile,
+    run_load,
+)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (0, 1, 50, 95, 99, 100)] == [1, 1, 50, 95, 99, 100]
+    # n=5: ceil(0.5*5)=3 -> 第 3 个；ceil(0.95*5)=5 -> 最大值
+    assert percentile([10, 20, 30, 40, 50], 50) == 30
+    assert percentile([10, 20, 30, 40, 50], 95) == 50
+    assert percentile([10, 20, 30, 40, 50], 40) == 20
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def _requests():
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None)
+    requests = build_requests(analyzer, [])[:2]
+    assert len(requests) == 2
+    return analyzer, requests
+
+
+@pytest.mark.parametrize('rate', [0.0, 500.0])
+def test_run_load_against_stub(rate):
+    analyzer, requests = _requests()
+
+    async def main():
+        stub = StubServer(analyzer, latency_ms=0)
+        await stub.start()
+        try:
+            return await run_load(requests, stub.url, 40, concurrency=4, rate=rate), stub.connections
+        finally:
+            await stub.stop()
+
+    (stats, elapsed, _), connections = asyncio.run(main())
+
+    assert elapsed > 0
+    for request in requests:
+        model_stats = stats[request.model]
+        assert model_stats.requests == 20
+        assert model_stats.errors == 0
+        assert model_stats.status_codes == {200: 20}
+        assert len(model_stats.latencies) == 20
+    # keep-alive: 连接数不超过连接池大小
+    assert 1 <= connections <= 4
+
+
+@pytest.mark.parametrize('response', [
+    b'garbage\r\n\r\n',
+    b'HTTP/1.1 200 OK\r\nX-Big: ' + b'a' * 100000 + b'\r\n\r\n',
+])
+def test_run_load_counts_malformed_responses_as_errors(response):
+    _, requests = _requests()
+
+    async def handle(reader, writer):
+        try:
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(response)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await run_load(requests, f'http://127.0.0.1:{port}', 6, concurrency=2)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    stats, _, _ = asyncio.run(main())
+
+    assert sum(s.errors for s in stats.values()) == 6
+    assert sum(len(s.latencies) for s in stats.values()) == 0
+
+
+def test_host_header_keeps_non_default_port():
+    assert ConnectionPool('http://localhost:8080', 1).host_header == 'localhost:8080'
+    assert ConnectionPool('http://localhost', 1).host_header == 'localhost'
+    assert ConnectionPool('https://example.com:443/api', 1).host_header == 'example.com'
@@ -0,0 +1,100 @@
+"""
+请求体积估算回归: 输入图片张数与尺寸、base64 膨胀、体积与尺寸阈值
+
+用法:
+    pytest test_payload_estimate.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_api_analyzer import APICall, GeminiAnalyzer, _ARRAY_PARAM_PATTERN, analyze  # noqa: E402
+
+
+@pytest.fixture
+def image_model(model_config):
+    return model_config(
+        'gemini-3-pro-image-preview', 'image_generation',
+        aspect_ratios=['1:1', '16:9'], image_sizes=['1K', '2K', '4K'],
+    )
+
+
+def _base64_len(raw: int) -> int:
+    # 每 3 字节编码为 4 个字符，末尾补齐
+    return -(-raw // 3) * 4
+
+
+def test_payload_1k_input_image(image_model):
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None)
+    call = APICall(
+        function='editImage', file='a.ts', line=1, has_image=True, matched_config=image_model,
+        image_params=['referenceImage'],
+        extracted_params={'imageConfig': {'imageSize': '4K', 'aspectRatio': '16:9'}},
+    )
+
+    est = analyzer.estimate_payload(call)
+
+    # 输入尺寸与输出 imageSize 无关
+    assert est.image_count == 1
+    assert est.image_dimensions == (1024, 1024)
+    assert est.output_dimensions == (4096, 2304)
+    assert est.inline_bytes == _base64_len(1024 * 1024 // 4)
+    assert est.inline_bytes > 1024 * 1024 // 4 * 4 / 3 - 4
+    assert est.request_bytes > est.inline_bytes
+    assert est.recommendations == []
+
+
+def test_payload_4k_array_input_images(image_model):
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None, input_image_edge=4096)
+    signature = 'prompt: string, referenceImages: string[]'
+    assert _ARRAY_PARAM_PATTERN.findall(signature) == ['referenceImages']
+    call = APICall(
+        function='compose', file='a.ts', line=1, has_image=True, matched_config=image_model,
+        image_params=['referenceImages'], image_array_params=['referenceImages'],
+        extracted_params={'imageConfig': {'aspectRatio': '5:1'}},
+    )
+
+    est = analyzer.estimate_payload(call)
+
+    assert est.image_count == 3
+    assert est.inline_bytes == 3 * _base64_len(4096 * 4096 // 4)
+    # 不支持的宽高比退回 1:1，未指定 imageSize 取最小一档
+    assert est.output_dimensions == (1024, 1024)
+    # 约 16 MB: 超过 4 MB 建议阈值但未超过 20 MB 上限；长边超过 2048
+    assert len(est.recommendations) == 2
+    assert 'File API' in est.recommendations[0] and '必须' not in est.recommendations[0]
+    assert '4096px' in est.recommendations[1]
+
+    analyzer.array_image_count = 5
+    assert '必须' in analyzer.estimate_payload(call).recommendations[0]
+
+
+def test_payload_inline_audio_input(model_config):
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None, input_audio_seconds=120)
+    model = model_config('gemini-2.5-flash', 'multimodal_understanding')
+    call = APICall(function='transcribe', file='a.py', line=1, has_audio=True, matched_config=model)
+
+    est = analyzer.estimate_payload(call)
+
+    # 120 秒 16kHz/16bit WAV = 3.84 MB，base64 后约 5.1 MB，超过 4 MB 建议阈值
+    assert est.audio_seconds == 120
+    assert est.inline_bytes == _base64_len(16000 * 2 * 120)
+    assert est.request_tokens >= 32 * 120
+    assert 'File API' in est.recommendations[0]
+
+    # TTS 的音频在响应里，请求不含内联音频
+    tts = APICall(function='speak', file='a.py', line=1, has_audio=True, has_tts=True, matched_config=model)
+    assert analyzer.estimate_payload(tts).audio_seconds == 0
+
+
+def test_analyze_forwards_estimate_options(tmp_path):
+    analyzer = analyze(
+        str(tmp_path), inline_bytes_threshold=1024, image_edge_threshold=512,
+        input_image_edge=4096, array_image_count=5, input_audio_seconds=10,
+    )
+    assert (analyzer.inline_bytes_threshold, analyzer.image_edge_threshold) == (1024, 512)
+    assert (analyzer.input_image_edge, analyzer.array_image_count, analyzer.input_audio_seconds) == (4096, 5, 10)
@@ -1,4 +1,32 @@
+"""
+正则回溯回归语料
+
+用法:
+    python test_regex.py      # 打印匹配结果与各语料的耗时曲线
+    pytest test_regex.py      # 断言匹配结果与最坏情况线性复杂度
+
+每条病态语料按 SIZES 逐级放大，若耗时增长明显快于输入增长（平方级回溯），
+测试失败。新发现的病态输入直接追加到 PATHOLOGICAL 中即可。
+"""
+
 import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import gemini_api_analyzer  # noqa: E402
+from gemini_api_analyzer import (  # noqa: E402
+    GeminiAnalyzer,
+    _METHOD_PATTERN,
+)
+
+# 分析器中所有预编译的模式都纳入回归
+PATTERNS = [
+    value for name, value in sorted(vars(gemini_api_analyzer).items())
+    if name.endswith('_PATTERN') and isinstance(value, re.Pattern)
+] + gemini_api_analyzer._MODEL_IDENTIFIER_PATTERNS
 
 content = """
 import { GoogleGenAI } from "@google/genai";
@@ -18,9 +46,153 @@ export class GeminiService {
 }
 """
 
-for match in re.finditer(r'(?:(?:public|private|protected|static)\s+)*(?:async\s+)?(\w+)\s*\(([^)]*)\)\s*(?::\s*[^{]+)?\s*\{', content):
-    print("Match:", match.group(1))
-    func_signature = match.group(2)
-    print("Sign:", func_signature)
-    print("Start:", match.end())
+# 每条语料: 名称 -> 生成长度约为 n 的输入
+PATHOLOGICAL = {
+    # 超长标识符（如内联 base64）: 每个起点都会让 \w+ 回溯
+    'long_identifier': lambda n: 'a' * n,
+    # 大量未闭合的左括号: [^)]* 每次都扫到文件末尾
+    'unclosed_parens': lambda n: 'f(' * (n // 2),
+    # 返回类型后没有 {: [^{]+ 与 \s* 交替回溯
+    'return_type_without_brace': lambda n: 'f(x): ' + 'T ' * (n // 2),
+    # minified bundle: 单行、密集调用、无换行
+    'minified_calls': lambda n: 'a(b):c;' * (n // 7),
+    # 未闭合的对象字面量 / 枚举 / 导入
+    'unclosed_object': lambda n: 'const A = {' + 'k: 1, ' * (n // 6),
+    'import_without_from': lambda n: 'import ' * (n // 7),
+    'model_identifier_chain': lambda n: 'model: a' + '.b' * (n // 2),
+    # 密集的 name: 片段，无逗号/换行: 参数名到类型关键字之间的惰性扫描
+    'colon_dense': lambda n: 'a:b ' * (n // 4),
+    # 函数签名中超长的类型段
+    'long_signature_segment': lambda n: 'function f(x: ' + 'A' * n + ')',
+    # 大量空白
+    'whitespace_run': lambda n: 'f(x)' + ' ' * n + ':',
+    # 普通 Python 模块: 大量短小的顶层函数
+    'many_python_functions': lambda n: 'def f(x):\n    return x\n\n' * (n // 25),
+}
+
+# 同时按函数解析的语料: 解析器自身（而非单个正则）也必须线性
+PARSER_CORPUS = {
+    'many_python_functions': ('m.py', PATHOLOGICAL['many_python_functions']),
+    'many_ts_functions': ('m.ts', lambda n: 'function f(x) {\n  return x;\n}\n' * (n // 30)),
+}
+
+SIZES = (20000, 80000)
+# 输入放大 4 倍，线性约为 4 倍，平方级约为 16 倍；留出计时抖动余量
+MAX_GROWTH = 8.0
+
+
+def _time_patterns(text: str) -> float:
+    start = time.perf_counter()
+    for pattern in PATTERNS:
+        for _ in pattern.finditer(text):
+            pass
+    return time.perf_counter() - start
+
+
+def _growth(make, timer=_time_patterns) -> float:
+    small, large = (timer(make(n)) for n in SIZES)
+    return large / max(small, 1e-4)
+
+
+def _parser_timer(name: str):
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None)
+    parser = analyzer._parse_python_file if name.endswith('.py') else analyzer._parse_file
+
+    def timer(text: str) -> float:
+        start = time.perf_counter()
+        parser(Path(name), text)
+        return time.perf_counter() - start
+    return timer
+
+
+def test_sample_methods_detected():
+    names = [m.group(1) for m in _METHOD_PATTERN.finditer(content)]
+    assert names == ['handleApiError', 'generateImage', 'editImage']
+
+
+def test_image_params_extracted():
+    analyzer = GeminiAnalyzer(Path('.'), config_path=None)
+    signature = 'prompt: string, config: { aspectRatio: AspectRatio; imageSize: ImageSize }'
+    assert analyzer._extract_image_params(signature) == ['config', 'imageSize']
+
+
+def test_pathological_inputs_are_linear():
+    for name, make in PATHOLOGICAL.items():
+        growth = _growth(make)
+        assert growth < MAX_GROWTH, f'{name}: 输入放大 4 倍耗时增长 {growth:.1f} 倍'
+
+
+def test_parsers_are_linear():
+    for name, (file_name, make) in PARSER_CORPUS.items():
+        growth = _growth(make, _parser_timer(file_name))
+        assert growth < MAX_GROWTH, f'{name}: 输入放大 4 倍解析耗时增长 {growth:.1f} 倍'
+
+
+def test_python_module_with_many_functions_stays_in_budget(tmp_path):
+    source = ''.join(f'def f{i}(x):\n    return x + {i}\n\n' for i in range(6000))
+    source += (
+        'class Client:\n'
+        '    def call(\n'
+        '        self,\n'
+        '    ):\n'
+        '        return post("https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent")\n'
+        '\n'
+        '    def close(self):\n'
+        '        pass\n'
+    )
+    (tmp_path / 'module.py').write_text(source, encoding='utf-8')
+
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None)
+    calls = analyzer.scan()
+
+    assert analyzer.degraded_files == []
+    assert [c.function for c in calls] == ['call']
+
+
+def test_python_fallback_names_def_and_merges_anchors(tmp_path):
+    source = (
+        'X = "' + 'a' * 500 + '"\n'
+        'def call_api():\n'
+        '    return post("https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent")\n'
+    )
+    (tmp_path / 'client.py').write_text(source, encoding='utf-8')
+
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None, max_line_length=100)
+    calls = analyzer.scan()
+
+    assert [item['action'] for item in analyzer.degraded_files] == ['fallback']
+    assert [c.function for c in calls] == ['call_api']
+
+
+def test_long_line_file_uses_fallback(tmp_path):
+    bundle = 'var x=' + 'a' * 50000 + ';function callApi(){return fetch("generateContent",{model:"gemini-2.5-flash"})}'
+    (tmp_path / 'bundle.ts').write_text(bundle, encoding='utf-8')
+
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None, max_line_length=10000)
+    calls = analyzer.scan()
+
+    assert [item['action'] for item in analyzer.degraded_files] == ['fallback']
+    assert [c.function for c in calls] == ['callApi']
+    assert calls[0].detected_model == 'gemini-2.5-flash'
+
+
+def test_oversized_file_is_skipped(tmp_path):
+    (tmp_path / 'huge.ts').write_text('x' * 2048, encoding='utf-8')
+
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None, max_file_bytes=1024)
+
+    assert analyzer.scan() == []
+    assert analyzer.degraded_files[0]['action'] == 'skipped'
+
+
+if __name__ == '__main__':
+    for match in _METHOD_PATTERN.finditer(content):
+        print("Match:", match.group(1))
+        print("Sign:", match.group(2))
+        print("Start:", match.end())
 
+    print()
+    for name, make in PATHOLOGICAL.items():
+        print(f"{name:<28} x{_growth(make):.1f}")
+    for name, (file_name, make) in PARSER_CORPUS.items():
+        print(f"{'parser:' + name:<28} x{_growth(make, _parser_timer(file_name)):.1f}")
@@ -0,0 +1,61 @@
+"""
+请求校验回归: 枚举取值、temperature / maxOutputTokens 范围、通用字段与跨类别字段
+
+用法:
+    pytest test_request_validator.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_api_analyzer import RequestValidator  # noqa: E402
+
+
+@pytest.fixture
+def text_model(model_config):
+    """只声明纯文本模板的模型"""
+    def make(**overrides):
+        return model_config(
+            request_templates={'request_template': {'contents': [{'parts': [{'text': '{{prompt}}'}]}]}},
+            **overrides,
+        )
+    return make
+
+
+def test_validator_reports_out_of_range_params(text_model):
+    validator = RequestValidator({
+        'gemini-3-flash-preview': text_model(thinking_levels=['low', 'high'], max_output_tokens=65536),
+        'gemini-2.5-flash-preview-tts': text_model(voices=['Kore', 'Puck']),
+    })
+    body = {'contents': [{'parts': [{'text': 'hi'}]}]}
+
+    violations = validator.validate('gemini-3-flash-preview', {
+        'thinkingConfig': {'thinkingLevel': 'medium'}, 'temperature': 3, 'maxOutputTokens': 100000,
+    }, body)
+    assert sorted(v.path for v in violations) == ['maxOutputTokens', 'temperature', 'thinkingConfig.thinkingLevel']
+    assert all(v.severity == 'error' for v in violations)
+
+    voice = validator.validate('gemini-2.5-flash-preview-tts', {'voiceConfig': {'voiceName': 'Nova'}}, body)
+    assert [v.path for v in voice] == ['voiceConfig.voiceName']
+
+    # 大小写不敏感，合法值不报错
+    assert validator.validate('gemini-3-flash-preview', {'thinkingConfig': {'thinkingLevel': 'HIGH'}}, body) == []
+
+
+def test_validator_accepts_generic_builder_fields(text_model):
+    validator = RequestValidator({'gemini-3-flash-preview': text_model()})
+    body = {
+        'contents': [{'parts': [{'inline_data': {'mime_type': 'image/jpeg', 'data': 'x'}}, {'text': 'hi'}]}],
+        'generationConfig': {'temperature': 1, 'thinkingConfig': {'thinkingLevel': 'low'}, 'responseMimeType': 'application/json'},
+    }
+    assert validator.validate('gemini-3-flash-preview', {}, body) == []
+
+    # 图片生成专用字段用在文本模型上仍然给出警告
+    body['generationConfig']['imageConfig'] = {'aspectRatio': '1:1'}
+    assert [(v.path, v.severity) for v in validator.validate('gemini-3-flash-preview', {}, body)] == [
+        ('generationConfig.imageConfig', 'warning')
+    ]
@@ -0,0 +1,147 @@
+"""
+项目级符号索引回归: 跨文件的常量 / 枚举 / 导入解析，以及按 (mtime_ns, size) 复用符号表
+
+用法:
+    pytest test_symbol_index.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from gemini_api_analyzer import FileSymbols, GeminiAnalyzer, SymbolIndex  # noqa: E402
+
+
+def _index(sources):
+    return SymbolIndex({path: SymbolIndex.parse(path, content) for path, content in sources.items()})
+
+
+def _write(root: Path, rel_path: str, content: str):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+
+
+def test_aliased_named_import():
+    index = _index({
+        'src/models.ts': "export const TEXT_MODEL = 'gemini-2.5-flash';",
+        'src/api.ts': "import { TEXT_MODEL as M } from './models';",
+    })
+    assert index.resolve('src/api.ts', 'M') == 'gemini-2.5-flash'
+    assert index.resolve('src/api.ts', 'TEXT_MODEL') is None
+
+
+def test_namespace_import_with_object_member():
+    index = _index({
+        'src/config.ts': "export const MODELS = {\n  x: 'gemini-3-pro-preview',\n  y: 'gemini-2.5-flash',\n};",
+        'src/api.ts': "import * as cfg from './config';",
+    })
+    assert index.resolve('src/api.ts', 'cfg.MODELS.x') == 'gemini-3-pro-preview'
+
+
+def test_path_alias_and_barrel_star_export():
+    index = _index({
+        'src/config/models.ts': "export enum Model {\n  Pro = 'gemini-3-pro-preview',\n  Flash = 'gemini-2.5-flash',\n}",
+        'src/config/index.ts': "export * from './models';",
+        'src/api.ts': "import { Model } from '@/config';",
+    })
+    assert index.resolve('src/api.ts', 'Model.Flash') == 'gemini-2.5-flash'
+
+
+def test_ts_enum_and_flat_object_literal():
+    index = _index({
+        'src/models.ts': (
+            "export const enum Model { Pro = 'gemini-3-pro-preview', Flash = 'gemini-2.5-flash' }\n"
+            "export const DEFAULTS = { model: 'gemini-2.5-flash-image', temperature: 0.7 };\n"
+        ),
+    })
+    assert index.resolve('src/models.ts', 'Model.Pro') == 'gemini-3-pro-preview'
+    assert index.resolve('src/models.ts', 'DEFAULTS.model') == 'gemini-2.5-flash-image'
+    assert index.resolve('src/models.ts', 'DEFAULTS.temperature') == 0.7
+
+
+def test_python_relative_import_enum_value(tmp_path):
+    _write(tmp_path, 'app/constants.py', (
+        "from enum import Enum\n"
+        "\n"
+        "class Models(str, Enum):\n"
+        "    PRO = 'gemini-3-pro-preview'\n"
+        "    FLASH = 'gemini-2.5-flash'\n"
+    ))
+    _write(tmp_path, 'app/client.py', (
+        "from .constants import Models\n"
+        "\n"
+        "def ask(prompt):\n"
+        "    return client.models.generateContent(model=Models.FLASH.value, contents=prompt)\n"
+    ))
+
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None)
+    calls = analyzer.scan()
+
+    assert analyzer.symbol_index.resolve('app/client.py', 'Models.PRO') == 'gemini-3-pro-preview'
+    assert [(c.function, c.detected_model) for c in calls] == [('ask', 'gemini-2.5-flash')]
+
+
+def test_symbol_cache_reuse_and_eviction(tmp_path):
+    _write(tmp_path, 'src/models.ts', "export const MODEL = 'gemini-2.5-flash';\n")
+    _write(tmp_path, 'src/old.ts', "export const OLD = 'gemini-2.0-flash-exp';\n")
+    analyzer = GeminiAnalyzer(tmp_path, config_path=None)
+
+    analyzer.scan()
+    first = analyzer._symbol_cache['src/models.ts'][1]
+
+    # 未变化: 复用同一个符号表对象
+    analyzer.scan()
+    assert analyzer._symbol_cache['src/models.ts'][1] is first
+
+    # 内容变化（大小不同）: 重新解析
+    _write(tmp_path, 'src/models.ts', "export const MODEL = 'gemini-3-pro-preview';\n")
+    # 删除的文件: 从缓存中移除
+    (tmp_path / 'src' / 'old.ts').unlink()
+    analyzer.scan()
+
+    assert analyzer._symbol_cache['src/models.ts'][1] is not first
+    assert analyzer.symbol_index.resolve('src/models.ts', 'MODEL') == 'gemini-3-pro-preview'
+    assert set(analyzer._symbol_cache) == {'src/models.ts'}
+
+
+def _large_index(size: int = 20000) -> SymbolIndex:
+    files = {f'src/gen/m{i}.ts': FileSymbols(module=f'src/gen/m{i}', constants={'X': i}) for i in range(size)}
+    files['src/models.ts'] = SymbolIndex.parse('src/models.ts', "export const MODEL = 'gemini-2.5-flash';")
+    files['src/api.ts'] = SymbolIndex.parse('src/api.ts', "import { MODEL } from './models';")
+    return SymbolIndex(files)
+
+
+def _buffer_symbols():
+    return SymbolIndex.parse('src/models.ts', "export const MODEL = 'gemini-2.5-pro';")
+
+
+def test_overlay_is_a_view():
+    index = _large_index()
+    assert index.resolve('src/api.ts', 'MODEL') == 'gemini-2.5-flash'
+
+    view = index.overlay('src/models.ts', _buffer_symbols())
+
+    # 不复制文件表和解析缓存
+    assert view.files is index.files
+    assert view._resolved is not index._resolved and view._resolved == {}
+    assert view.resolve('src/api.ts', 'MODEL') == 'gemini-2.5-pro'
+
+    # 依赖缓冲区的结果只留在视图中，共享索引不受影响
+    assert index.resolve('src/api.ts', 'MODEL') == 'gemini-2.5-flash'
+    assert ('src/api.ts', 'MODEL') in view._resolved
+    # 与缓冲区无关的结果写入共享缓存
+    assert view.resolve('src/gen/m7.ts', 'X') == 7
+    assert ('src/gen/m7.ts', 'X') in index._resolved
+    assert ('src/gen/m7.ts', 'X') not in view._resolved
+
+
+if __name__ == '__main__':
+    index = _large_index()
+    index.resolve('src/api.ts', 'MODEL')
+    start = time.perf_counter()
+    view = index.overlay('src/models.ts', _buffer_symbols())
+    view.resolve('src/api.ts', 'MODEL')
+    print(f"overlay + resolve on {len(index.files)} files: {(time.perf_counter() - start) * 1000:.3f} ms")